@@ -0,0 +1,77 @@
+"""
+Cache Micro-benchmark
+Measures cold and warm reads from the SQLite data cache
+
+Run from the repository root:
+    python benchmarks/bench_cache.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import CacheStore
+
+ROUNDS = 1000
+
+def sample_payloads():
+    """Payloads shaped like real weather, news and stock records"""
+    weather = {
+        'city': 'Helsinki', 'temperature': -3.4, 'feels_like': -8.1,
+        'humidity': 86, 'wind_speed': 5.2, 'description': 'Lumisadetta',
+        'icon': '❄️', 'icon_code': '13d'
+    }
+    news = [
+        {'source': 'Yle', 'title': f'Uutisotsikko numero {i} ' * 3,
+         'link': f'https://yle.fi/a/{i}', 'published': 'Mon, 06 Jan 2025 08:00:00 +0200'}
+        for i in range(20)
+    ]
+    stocks = [
+        {'symbol': f'SYM{i}.HE', 'name': f'Yhtiö {i}', 'price': 10.0 + i, 'change': 0.5 - i / 10}
+        for i in range(6)
+    ]
+    return {'weather': weather, 'news': news, 'stocks': stocks}
+
+def measure(func, rounds):
+    """Return mean milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+def main():
+    payloads = sample_payloads()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        
+        store = CacheStore(db_path)
+        # Filler rows so index lookups are not trivially small
+        for i in range(5000):
+            store.put('filler', {'n': i}, 3600, key=str(i))
+        for source, data in payloads.items():
+            store.put(source, data, 3600)
+        store.close()
+        
+        print(f"{'source':<10}{'cold ms':>12}{'warm ms':>12}")
+        for source in payloads:
+            # Cold: new store and connection for every read
+            def cold_read():
+                cold_store = CacheStore(db_path)
+                cold_store.get(source)
+                cold_store.close()
+            
+            warm_store = CacheStore(db_path)
+            warm_store.get(source)
+            
+            cold = measure(cold_read, ROUNDS // 10)
+            warm = measure(lambda: warm_store.get(source), ROUNDS)
+            warm_store.close()
+            
+            print(f"{source:<10}{cold:>12.3f}{warm:>12.3f}")
+
+if __name__ == '__main__':
+    main()
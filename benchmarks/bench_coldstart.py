@@ -0,0 +1,194 @@
+"""
+Cold Start Benchmark
+Time until MainScreen's cards are populated after a cold start, filled
+from the SQLite data cache (the previous path) and from the binary
+dashboard snapshot
+
+Each round is a fresh interpreter. The Kivy window is left out: without a
+display no frame is drawn, so "ready" is the moment MainScreen has been
+built and every card holds its data, which is what the first frame shows.
+load_initial_data is also timed on its own, and within it the reads that
+produce the cards' data (cache queries and the calendar week, or the
+snapshot read); the rest is building row widgets, the same for both
+paths. Name days come from a generated nimipaivat.json. "warm" keeps
+the compiled name day and calendar files, as on a phone started before;
+"cold" deletes them before every start, as after an update.
+
+Finally a snapshot with a corrupt body is checked to fall back to the
+data cache; the script exits non-zero if it does not.
+
+Run from the repository root (headless Linux is fine):
+    python benchmarks/bench_coldstart.py [--rounds 10] [--cities 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from bench_startup import write_source
+from stub_server import provider_routes, _weather_record
+
+CITIES = ["Helsinki", "Espoo", "Tampere", "Vantaa", "Oulu", "Turku", "Jyväskylä",
+          "Kuopio", "Lahti", "Pori", "Joensuu", "Lappeenranta", "Vaasa", "Rovaniemi"]
+
+SCREEN = """
+import json, os, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+from kivymd.app import MDApp
+from services import BackgroundService, DataManager, SettingsManager
+
+app = MDApp()
+settings = SettingsManager()
+settings.settings.update({settings!r})
+data_manager = DataManager({db!r})
+data_manager.name_days.source = {source!r}
+if not {use_snapshot!r}:
+    # The path before snapshots: every card from the data cache
+    data_manager.snapshot.read = lambda: None
+    data_manager.snapshot.write = lambda *args, **kwargs: None
+service = BackgroundService(data_manager, settings)
+
+timings = {{'data': 0.0}}
+def timed_read(read):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return read(*args, **kwargs)
+        finally:
+            timings['data'] += (time.perf_counter() - start) * 1000
+    return wrapper
+for owner, name in ((data_manager, 'load_weather'), (data_manager, 'load_forecast'),
+                    (data_manager, 'load_entry'), (data_manager, 'last_fetched_at'),
+                    (data_manager.calendar, 'week'), (data_manager.snapshot, 'read')):
+    setattr(owner, name, timed_read(getattr(owner, name)))
+
+load_initial_data = main.MainScreen.load_initial_data
+def timed(screen):
+    start = time.perf_counter()
+    load_initial_data(screen)
+    timings['load'] = (time.perf_counter() - start) * 1000
+main.MainScreen.load_initial_data = timed
+
+screen = main.MainScreen(data_manager, settings, service)
+ready = (time.perf_counter() - t0) * 1000
+assert screen.temp_label.text.endswith("°C") and screen.news_rows.values
+print(json.dumps({{'ready': ready, 'load': timings['load'], 'data': timings['data']}}))
+# As the app does on stop
+screen.save_snapshot()
+"""
+
+def seed(data_dir, cities):
+    """Fill the data cache like a dashboard that has refreshed every source"""
+    from forecast import Forecast
+    from services import DataManager
+
+    data_manager = DataManager(os.path.join(data_dir, "infonaytto.db"))
+    for city in cities:
+        data_manager.save_to_db('weather', data_manager._weather_record(
+            _weather_record(city), city), key=city)
+    _, body = provider_routes()['/data/2.5/forecast']({'q': cities[0]})
+    data_manager.save_to_db('forecast', Forecast.from_owm(json.loads(body), cities[0]).to_dict(),
+                            key=cities[0])
+    now = time.time()
+    data_manager.save_to_db('news', [{
+        'guid': f"yle-{n}", 'source': "Yle", 'title': f"Uutinen numero {n} " * 4,
+        'link': f"https://yle.fi/a/{n}", 'published': "", 'published_at': now - n * 600
+    } for n in range(data_manager.NEWS_LIMIT)])
+    data_manager.save_to_db('stocks', [{
+        'symbol': symbol, 'name': name, 'price': 10.0 + n, 'change': n - 2.5
+    } for n, (symbol, name) in enumerate(data_manager.STOCK_SYMBOLS)])
+    data_manager.close()
+
+def run(script, env, prepare=None):
+    if prepare:
+        prepare()
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                         env=env, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result['process'] = (time.perf_counter() - start) * 1000
+    return result
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--cities', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "nimipaivat.json")
+        write_source(source)
+        seed(tmp, CITIES[:args.cities])
+        env = dict(os.environ, INFONAYTTO_DATA_DIR=tmp)
+        settings = {'default_city': CITIES[0], 'weather_cities': ", ".join(CITIES[1:args.cities])}
+
+        def script(use_snapshot):
+            return SCREEN.format(root=ROOT, settings=settings, source=source,
+                                 db=os.path.join(tmp, "infonaytto.db"), use_snapshot=use_snapshot)
+
+        # Warm the compiled name day and calendar caches, then write the snapshot
+        run(script(False), env)
+        run(script(True), env)
+        snapshot_path = os.path.join(tmp, "dashboard.snap")
+        size = os.path.getsize(snapshot_path)
+
+        print(f"{args.cities} cities, snapshot {size} bytes, median of {args.rounds} cold starts")
+        def clear_calendar():
+            for name in os.listdir(tmp):
+                if name.endswith(".bin"):
+                    os.remove(os.path.join(tmp, name))
+
+        print(f"{'first frame from':<24}{'process ms':>12}{'ready ms':>10}{'load ms':>10}"
+              f"{'data ms':>10}")
+        cases = [("data cache, warm", False, None), ("snapshot, warm", True, None),
+                 ("data cache, cold", False, clear_calendar), ("snapshot, cold", True, clear_calendar)]
+        for name, use_snapshot, prepare in cases:
+            results = [run(script(use_snapshot), env, prepare) for _ in range(args.rounds)]
+            print(f"{name:<24}{median([r['process'] for r in results]):>12.1f}"
+                  f"{median([r['ready'] for r in results]):>10.1f}"
+                  f"{median([r['load'] for r in results]):>10.2f}"
+                  f"{median([r['data'] for r in results]):>10.2f}")
+
+        # Cost of keeping the snapshot current: one write per update batch,
+        # at most every SNAPSHOT_INTERVAL seconds
+        from snapshot import DashboardSnapshot
+        snapshot = DashboardSnapshot(snapshot_path)
+        state = snapshot.read()
+        start = time.perf_counter()
+        for _ in range(100):
+            snapshot.write(state)
+        print(f"snapshot write {(time.perf_counter() - start) * 10:.2f} ms")
+
+        # A snapshot with a valid header but a corrupt body must read as
+        # None, and the screen must come up from the data cache instead
+        from snapshot import HEADER
+        with open(snapshot_path, 'r+b') as f:
+            f.seek(HEADER.size)
+            f.write(b'a')
+        ok = snapshot.read() is None
+        try:
+            run(script(True), env)
+        except subprocess.CalledProcessError:
+            ok = False
+        print(f"corrupt snapshot falls back to the data cache: {'ok' if ok else 'FAIL'}")
+        if not ok:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Refresh Fan-out Benchmark
+End-to-end refresh latency with sequential vs concurrent source fetches
+
+Weather, news and stocks are served by separate local stub servers with
+different latencies. A concurrent refresh should take about as long as
+the slowest source instead of the sum of all three.
+
+Run from the repository root:
+    python benchmarks/bench_fanout.py
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedparser
+
+from http_client import HttpClient
+from scheduler import RefreshScheduler
+from stub_server import StubServer
+
+CYCLES = 5
+LATENCY = {'weather': 0.3, 'news': 0.5, 'stocks': 0.8}
+
+WEATHER_JSON = json.dumps({
+    'name': 'Helsinki',
+    'main': {'temp': -2.5, 'feels_like': -7.0, 'humidity': 80},
+    'weather': [{'icon': '13d', 'description': 'lumisadetta'}],
+    'wind': {'speed': 4.0}
+}).encode()
+
+NEWS_RSS = ("<?xml version='1.0'?><rss version='2.0'><channel><title>Stub</title>"
+            + "".join(f"<item><title>Uutinen {i}</title><link>http://stub/{i}</link>"
+                      f"<guid>{i}</guid></item>" for i in range(20))
+            + "</channel></rss>").encode()
+
+STOCKS_JSON = json.dumps([
+    {'symbol': f'SYM{i}.HE', 'name': f'Yhtiö {i}', 'price': 10.0 + i, 'change': 0.1 * i}
+    for i in range(6)
+]).encode()
+
+def start_servers():
+    return {
+        'weather': StubServer({'/weather': ('application/json', WEATHER_JSON)},
+                              LATENCY['weather']).start(),
+        'news': StubServer({'/rss': ('application/rss+xml', NEWS_RSS)},
+                           LATENCY['news']).start(),
+        'stocks': StubServer({'/quotes': ('application/json', STOCKS_JSON)},
+                             LATENCY['stocks']).start()
+    }
+
+def make_fetchers(servers, client):
+    def weather():
+        return client.get(servers['weather'].url + '/weather', source='weather').json()
+    
+    def news():
+        response = client.get(servers['news'].url + '/rss', source='news')
+        return feedparser.parse(response.content).entries
+    
+    def stocks():
+        return client.get(servers['stocks'].url + '/quotes', source='stocks').json()
+    
+    return {'weather': weather, 'news': news, 'stocks': stocks}
+
+def run_cycle(fetchers, max_workers):
+    """One refresh of every source; returns total and per-card seconds"""
+    scheduler = RefreshScheduler(max_workers=max_workers)
+    done = threading.Event()
+    finished = {}
+    
+    for name, fetch in fetchers.items():
+        scheduler.add_source(name, fetch, 3600, jitter=0)
+    
+    start = time.perf_counter()
+    
+    def on_data(name):
+        def callback(data):
+            finished[name] = time.perf_counter() - start
+            if len(finished) == len(fetchers):
+                done.set()
+        return callback
+    
+    for name in fetchers:
+        scheduler.subscribe(name, on_data(name))
+    
+    scheduler.start()
+    done.wait(30)
+    scheduler.stop()
+    return time.perf_counter() - start, finished
+
+def main():
+    servers = start_servers()
+    client = HttpClient()
+    fetchers = make_fetchers(servers, client)
+    
+    # Warm connections so both modes start from a pooled session
+    for fetch in fetchers.values():
+        fetch()
+    
+    print(f"Source latencies: {LATENCY} (sum {sum(LATENCY.values()):.1f} s, "
+          f"max {max(LATENCY.values()):.1f} s)")
+    print(f"{'mode':<12}{'total ms':>10}" + "".join(f"{n + ' ms':>12}" for n in fetchers))
+    
+    for mode, workers in (('sequential', 0), ('concurrent', 4)):
+        totals = []
+        cards = {name: [] for name in fetchers}
+        for _ in range(CYCLES):
+            total, finished = run_cycle(fetchers, workers)
+            totals.append(total)
+            for name, elapsed in finished.items():
+                cards[name].append(elapsed)
+        
+        row = f"{mode:<12}{sum(totals) / len(totals) * 1000:>10.0f}"
+        row += "".join(f"{sum(v) / len(v) * 1000:>12.0f}" for v in cards.values())
+        print(row)
+    
+    client.close()
+    for server in servers.values():
+        server.stop()
+
+if __name__ == '__main__':
+    main()
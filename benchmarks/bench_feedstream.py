@@ -0,0 +1,97 @@
+"""
+Feed Parsing Benchmark
+Parse time and peak memory of feedparser vs the streaming feed reader
+
+Each case runs in a fresh subprocess so peak RSS is not polluted by the
+other cases. Sample feeds live in benchmarks/data.
+
+Run from the repository root:
+    python benchmarks/bench_feedstream.py
+"""
+
+import gzip
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATA_DIR = os.path.join(ROOT, "benchmarks", "data")
+FEEDS = ["large_rss.xml.gz", "large_atom.xml.gz"]
+CHUNK_SIZE = 16384
+LIMIT = 5
+ROUNDS = 5
+
+def load(name):
+    with gzip.open(os.path.join(DATA_DIR, name)) as f:
+        return f.read()
+
+def chunked(body):
+    for i in range(0, len(body), CHUNK_SIZE):
+        yield body[i:i + CHUNK_SIZE]
+
+def run_case(mode, name):
+    """Parse one feed in this process and report time and memory"""
+    import feedparser
+    from feedstream import read_feed
+    
+    body = load(name)
+    
+    if mode == 'feedparser':
+        def parse():
+            return feedparser.parse(body).entries[:LIMIT]
+    elif mode == 'stream':
+        def parse():
+            return read_feed(chunked(body), LIMIT)
+    else:
+        # Everything from the fifth entry on was seen in an earlier cycle
+        seen = {entry['guid'] for entry in read_feed(chunked(body), 20)[4:]}
+        
+        def parse():
+            return read_feed(chunked(body), 20, seen)
+    
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    
+    tracemalloc.start()
+    items = parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        parse()
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    
+    print(json.dumps({
+        'items': len(items),
+        'ms': elapsed * 1000,
+        'peak_kb': peak / 1024,
+        'rss_kb': rss_after - rss_before
+    }))
+
+def main():
+    print(f"{'feed':<20}{'mode':<12}{'items':>6}{'parse ms':>10}"
+          f"{'peak KB':>10}{'RSS +KB':>10}")
+    for name in FEEDS:
+        size = len(load(name)) // 1024
+        for mode in ('feedparser', 'stream', 'seen-stop'):
+            output = subprocess.run(
+                [sys.executable, __file__, mode, name],
+                capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{name[:-7] + f' ({size} KB)':<20}{mode:<12}{result['items']:>6}"
+                  f"{result['ms']:>10.1f}{result['peak_kb']:>10.0f}{result['rss_kb']:>10}")
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3:
+        run_case(sys.argv[1], sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,177 @@
+"""
+Refresh Cycle Benchmark
+End-to-end cost of one refresh of every source, driven through DataManager
+and BackgroundService's scheduler against the local stub providers
+
+The stub server runs in its own process, so CPU time and memory are the
+app's alone. Every cycle expires the cached data and asks the scheduler
+to refresh all sources, then waits until weather, news and stocks have
+reported back. Reported per cycle: p50/p95 latency, bytes received, CPU
+time and peak traced Python memory above the cycle's starting point.
+The first cycle resolves city IDs and downloads everything, so it is
+shown on its own.
+
+Yahoo Finance cannot be pointed at a local server, so stock downloads go
+to the stub's /quotes endpoint through the shared HTTP client instead of
+yfinance.
+
+Run from the repository root (headless Linux is fine):
+    python benchmarks/bench_refresh.py [--cycles 20] [--latency 0.05]
+        [--error-rate 0.0] [--no-etags] [--new-items 2] [--cities 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+import services
+from quotes import Quote
+from services import BackgroundService, DataManager, SettingsManager
+
+CITIES = ["Helsinki", "Espoo", "Tampere", "Vantaa", "Oulu", "Turku", "Jyväskylä",
+          "Kuopio", "Lahti", "Pori", "Joensuu", "Lappeenranta", "Vaasa", "Rovaniemi"]
+WAIT_FOR = ('weather', 'news', 'stocks')
+CYCLE_TIMEOUT = 120
+
+def start_stub(args):
+    """Start stub_server.py in a subprocess; returns (process, base url)"""
+    command = [sys.executable, os.path.join(ROOT, 'benchmarks', 'stub_server.py'),
+               '--latency', str(args.latency), '--error-rate', str(args.error_rate),
+               '--new-items', str(args.new_items)]
+    if args.no_etags:
+        command.append('--no-etags')
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    return process, process.stdout.readline().strip()
+
+def point_at_stub(data_manager, base):
+    """Send every provider request of data_manager to the stub server"""
+    data_manager.WEATHER_URL = base + "/data/2.5/weather"
+    data_manager.WEATHER_GROUP_URL = base + "/data/2.5/group"
+    data_manager.FORECAST_URL = base + "/data/2.5/forecast"
+    data_manager.NEWS_FEEDS = [("Yle", base + "/rss/yle"), ("HS", base + "/rss/hs")]
+
+    def download_quotes(symbols):
+        response = data_manager.http.get(base + "/quotes", params={
+            'symbols': ",".join(symbol for symbol, _ in symbols)
+        }, source='stocks', conditional=False)
+        response.raise_for_status()
+        names = dict(symbols)
+        return [Quote(item['symbol'], names[item['symbol']], item['price'],
+                      (item['price'] - item['previous']) / item['previous'] * 100)
+                for item in response.json()]
+    services.download_quotes = download_quotes
+
+def expire_all(data_manager):
+    """Make every cached source due, as if its TTL had run out"""
+    conn = data_manager.cache._connection()
+    # Just expired, like a real TTL; long-expired entries would be purged
+    conn.execute("UPDATE cache SET expires_at = ? WHERE source != 'weather_id'",
+                 (time.time() - 1,))
+    conn.commit()
+    data_manager.quotes.update([], fetched_at=0)
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh cycle benchmark")
+    parser.add_argument('--cycles', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.05, help="stub seconds per request")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of stub 500s")
+    parser.add_argument('--no-etags', action='store_true', help="stub never answers 304")
+    parser.add_argument('--new-items', type=int, default=2, help="new feed items per request")
+    parser.add_argument('--cities', type=int, default=5, help="weather cities")
+    args = parser.parse_args()
+
+    process, base = start_stub(args)
+    tmp = tempfile.TemporaryDirectory()
+    try:
+        settings = SettingsManager()
+        settings.settings.update({
+            'api_key': 'stub',
+            'default_city': CITIES[0],
+            'weather_cities': ", ".join(CITIES[1:args.cities]),
+            'weather_alerts': False
+        })
+        data_manager = DataManager(os.path.join(tmp.name, "bench.db"))
+        point_at_stub(data_manager, base)
+        service = BackgroundService(data_manager, settings)
+
+        reported = {}
+        done = threading.Event()
+
+        def watcher(name, ok):
+            reported[name] = ok
+            if all(source in reported for source in WAIT_FOR):
+                done.set()
+        service.scheduler.watch(watcher)
+
+        def total_bytes():
+            return sum(s['bytes_received'] for s in data_manager.get_http_stats().values())
+
+        def total_304():
+            return sum(s['not_modified'] for s in data_manager.get_http_stats().values())
+
+        tracemalloc.start()
+        service.start()
+        rows = []
+        for cycle in range(args.cycles):
+            expire_all(data_manager)
+            reported.clear()
+            done.clear()
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+            bytes_before, not_modified_before = total_bytes(), total_304()
+            cpu = time.process_time()
+            start = time.perf_counter()
+
+            service.refresh_all()
+            if not done.wait(CYCLE_TIMEOUT):
+                sys.exit(f"cycle {cycle + 1} did not finish in {CYCLE_TIMEOUT} s")
+
+            rows.append({
+                'ms': (time.perf_counter() - start) * 1000,
+                'cpu_ms': (time.process_time() - cpu) * 1000,
+                'bytes': total_bytes() - bytes_before,
+                'not_modified': total_304() - not_modified_before,
+                'peak_kib': (tracemalloc.get_traced_memory()[1] - traced_before) / 1024,
+                'failed': sum(reported[source] is False for source in WAIT_FOR)
+            })
+        service.stop()
+        tracemalloc.stop()
+        data_manager.close()
+    finally:
+        process.terminate()
+        process.wait()
+        tmp.cleanup()
+
+    print(f"stub latency {args.latency * 1000:.0f} ms, error rate {args.error_rate:.0%}, "
+          f"304 {'off' if args.no_etags else 'on'}, {args.cities} cities, "
+          f"{args.new_items} new items per feed request")
+    first, rest = rows[0], rows[1:] or rows[:1]
+    print(f"{'':<14}{'latency ms':>12}{'bytes':>10}{'304s':>6}{'CPU ms':>9}"
+          f"{'peak +KiB':>10}{'failed':>8}")
+    print(f"{'first cycle':<14}{first['ms']:>12.1f}{first['bytes']:>10}"
+          f"{first['not_modified']:>6}{first['cpu_ms']:>9.1f}{first['peak_kib']:>10.0f}"
+          f"{first['failed']:>8}")
+    for p in (50, 95):
+        print(f"{f'p{p} of {len(rest)}':<14}{percentile([r['ms'] for r in rest], p):>12.1f}"
+              f"{percentile([r['bytes'] for r in rest], p):>10}"
+              f"{percentile([r['not_modified'] for r in rest], p):>6}"
+              f"{percentile([r['cpu_ms'] for r in rest], p):>9.1f}"
+              f"{percentile([r['peak_kib'] for r in rest], p):>10.0f}"
+              f"{percentile([r['failed'] for r in rest], p):>8}")
+
+if __name__ == '__main__':
+    main()
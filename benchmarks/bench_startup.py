@@ -0,0 +1,118 @@
+"""
+Startup Benchmark
+Measures how long the week view's name days take to become ready at
+startup, with the old eager nimipaivat.json parse and with the lazily
+loaded, compiled name day store
+
+Both cases do the same work and produce the same week of names. Modules
+the app has imported anyway by then (finnish_calendar and json through
+the data layer, hashlib through the data cache, datetime) are loaded
+before the clock starts, so "ready" is only the name day path: parsing
+the JSON, or reading the compiled file. "cold" deletes the compiled file
+before every start, as on the first start after an update, which parses
+the JSON and writes the file; "warm" keeps it, as on every later start.
+The process column is the whole interpreter run, dominated by
+interpreter start-up.
+
+A real first frame needs a display, so the Kivy window is left out.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROUNDS = 10
+
+# Imported by the app before the calendar is first needed
+PRELUDE = """
+import sys, time
+import hashlib, json
+from datetime import date, timedelta
+sys.path.insert(0, {root!r})
+from finnish_calendar import NameDayStore
+t0 = time.perf_counter()
+"""
+
+WEEK = """
+today = date.today()
+monday = today - timedelta(days=today.weekday())
+days = [monday + timedelta(days=i) for i in range(7)]
+week = [lookup(day.month, day.day) for day in days]
+print((time.perf_counter() - t0) * 1000)
+"""
+
+# The pre-change start: parse and join every day at import, then look up the week
+EAGER = PRELUDE + """
+with open({source!r}, encoding="utf-8") as f:
+    NAME_DAYS = {{(i["month"], i["day"]): ", ".join(i["names"]) for i in json.load(f)}}
+lookup = lambda month, day: NAME_DAYS.get((month, day), "")
+""" + WEEK
+
+STORE = PRELUDE + """
+lookup = NameDayStore({source!r}, {cache_dir!r}).get
+""" + WEEK
+
+def write_source(path):
+    """nimipaivat.json shaped like the real one: 1-4 names on every day"""
+    items = []
+    for n in range(366):
+        month, day = divmod(n, 31)
+        if day >= 28 + (month != 1) * 3:
+            continue
+        names = [f"Nimi{n}_{k}" for k in range(1 + n % 4)]
+        items.append({'month': month + 1, 'day': day + 1, 'names': names})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(items, f, ensure_ascii=False)
+
+def run(script):
+    """Return (process wall ms, in-process ms to week data) for one cold run"""
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True,
+                         text=True, check=True).stdout
+    return (time.perf_counter() - start) * 1000, float(out.strip().splitlines()[-1])
+
+def measure(script, prepare=None):
+    walls, readies = [], []
+    for _ in range(ROUNDS):
+        if prepare:
+            prepare()
+        wall, ready = run(script)
+        walls.append(wall)
+        readies.append(ready)
+    walls.sort()
+    readies.sort()
+    return walls[len(walls) // 2], readies[len(readies) // 2]
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "nimipaivat.json")
+        cache_dir = os.path.join(tmp, "cache")
+        os.mkdir(cache_dir)
+        write_source(source)
+
+        def clear_cache():
+            for name in os.listdir(cache_dir):
+                os.remove(os.path.join(cache_dir, name))
+
+        store = STORE.format(root=ROOT, source=source, cache_dir=cache_dir)
+        cases = [
+            ("eager json", EAGER.format(root=ROOT, source=source), None),
+            ("store, cold", store, clear_cache),
+            ("store, warm", store, None),
+        ]
+
+        print(f"{'case':<14}{'process ms':>12}{'ready ms':>12}   (median of {ROUNDS})")
+        for name, script, prepare in cases:
+            wall, ready = measure(script, prepare)
+            print(f"{name:<14}{wall:>12.1f}{ready:>12.2f}")
+
+if __name__ == '__main__':
+    main()
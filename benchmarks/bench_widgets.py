@@ -0,0 +1,155 @@
+"""
+Widget Churn Benchmark
+Counts widget allocations and property writes per hour of dashboard updates
+
+Compares rebuilding rows with clear_widgets() against the RowPool diff
+layer. Uses lightweight stand-in widgets, so it runs without a display.
+
+Run from the repository root:
+    python benchmarks/bench_widgets.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rowpool import RowPool, assign
+
+class Counter:
+    allocations = 0
+    writes = 0
+
+class FakeWidget:
+    """Counts instances and property writes like a Kivy widget would trigger"""
+    
+    def __init__(self, **props):
+        object.__setattr__(self, 'children', [])
+        object.__setattr__(self, 'text', '')
+        object.__setattr__(self, 'text_color', [1, 1, 1, 1])
+        object.__setattr__(self, 'height', 0)
+        Counter.allocations += 1
+        for name, value in props.items():
+            setattr(self, name, value)
+    
+    def __setattr__(self, name, value):
+        Counter.writes += 1
+        object.__setattr__(self, name, value)
+    
+    def add_widget(self, widget, index=0):
+        self.children.insert(index, widget)
+    
+    def remove_widget(self, widget):
+        self.children.remove(widget)
+    
+    def clear_widgets(self):
+        self.children.clear()
+
+CITIES = ["UTC", "Tokyo", "London", "New York"]
+
+def clock_values(minute):
+    return [(city, f"{(minute // 60 + i) % 24:02d}:{minute % 60:02d}")
+            for i, city in enumerate(CITIES)]
+
+def day_values(minute):
+    return [(f"Pv {d}", [1, 1, 1, 1], "Nimi" if d % 2 else "") for d in range(7)]
+
+def news_values(minute):
+    newest = minute // 15
+    return [f"Otsikko {n}" for n in range(newest, newest - 5, -1)]
+
+def stock_values(minute):
+    return [f"Yhtiö {i} {10 + i + minute // 30:.2f}" for i in range(6)]
+
+# Old behaviour: clear the layout and build every row again
+
+def rebuild_clocks(layout, values):
+    layout.clear_widgets()
+    for city, time_text in values:
+        row = FakeWidget(height=25)
+        row.add_widget(FakeWidget(text=city))
+        row.add_widget(FakeWidget(text=time_text, text_color=[0.6, 0.87, 1, 1]))
+        layout.add_widget(row)
+
+def rebuild_days(layout, values):
+    layout.clear_widgets()
+    for day_text, color, info in values:
+        row = FakeWidget(height=45 if info else 35)
+        row.add_widget(FakeWidget(text=day_text, text_color=color, height=20))
+        if info:
+            row.add_widget(FakeWidget(text=info, height=15))
+        layout.add_widget(row)
+
+def rebuild_labels(layout, values):
+    layout.clear_widgets()
+    for text in values:
+        layout.add_widget(FakeWidget(text=text, height=25))
+
+# New behaviour: RowPool reuses rows
+
+def clock_row():
+    row = FakeWidget(height=25)
+    row.city = FakeWidget()
+    row.time = FakeWidget(text_color=[0.6, 0.87, 1, 1])
+    return row
+
+def update_clock_row(row, value):
+    assign(row.city, text=value[0])
+    assign(row.time, text=value[1])
+
+def day_row():
+    row = FakeWidget(height=35)
+    row.day = FakeWidget(height=20)
+    row.info = FakeWidget(height=0)
+    return row
+
+def update_day_row(row, value):
+    day_text, color, info = value
+    assign(row, height=45 if info else 35)
+    assign(row.day, text=day_text, text_color=color)
+    assign(row.info, text=info, height=15 if info else 0)
+
+def label_row():
+    return FakeWidget(height=25)
+
+def update_label_row(row, value):
+    assign(row, text=value)
+
+def simulate_hour(pooled):
+    Counter.allocations = Counter.writes = 0
+    layouts = {name: FakeWidget() for name in ('clocks', 'days', 'news', 'stocks')}
+    
+    if pooled:
+        pools = {
+            'clocks': RowPool(layouts['clocks'], clock_row, update_clock_row),
+            'days': RowPool(layouts['days'], day_row, update_day_row),
+            'news': RowPool(layouts['news'], label_row, update_label_row),
+            'stocks': RowPool(layouts['stocks'], label_row, update_label_row)
+        }
+        update = {name: pool.update for name, pool in pools.items()}
+    else:
+        update = {
+            'clocks': lambda v: rebuild_clocks(layouts['clocks'], v),
+            'days': lambda v: rebuild_days(layouts['days'], v),
+            'news': lambda v: rebuild_labels(layouts['news'], v),
+            'stocks': lambda v: rebuild_labels(layouts['stocks'], v)
+        }
+    
+    for minute in range(60):
+        update['clocks'](clock_values(minute))
+        update['days'](day_values(minute))
+        if minute % 15 == 0:
+            update['news'](news_values(minute))
+        if minute % 30 == 0:
+            update['stocks'](stock_values(minute))
+    
+    return Counter.allocations, Counter.writes
+
+def main():
+    print(f"{'mode':<12}{'allocations/h':>15}{'writes/h':>10}")
+    for name, pooled in (('rebuild', False), ('row pool', True)):
+        allocations, writes = simulate_hour(pooled)
+        print(f"{name:<12}{allocations:>15}{writes:>10}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Import-time Profile
+Per-module cumulative import times of the app's startup path, from
+python -X importtime
+
+The main stage is what runs before the first frame (import main). The
+deferred stage is what the first fetches import on refresh worker
+threads. Runs on desktop Linux without a display, because no window is
+created.
+
+Run from the repository root:
+    python benchmarks/profile_imports.py [--top N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = [
+    ("main (before first frame)", "import main"),
+    ("deferred (worker threads)", "import main; import http_client, feedparser, yfinance"),
+]
+
+def import_times(statement):
+    """{module: (self ms, cumulative ms)} for modules first imported by statement"""
+    env = dict(os.environ, KIVY_NO_ARGS='1', KIVY_NO_CONSOLELOG='1')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode:
+        sys.exit(f"{statement!r} failed:\n{result.stderr[-2000:]}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(own) / 1000, int(cumulative) / 1000)
+    return times
+
+def top_level(times):
+    """Self time summed per top-level package, e.g. all of pandas.*"""
+    totals = {}
+    for name, (own, _) in times.items():
+        package = name.split('.')[0]
+        totals[package] = totals.get(package, 0.0) + own
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--top', type=int, default=15, help="rows per table")
+    args = parser.parse_args()
+
+    previous = {}
+    for title, statement in STAGES:
+        times = import_times(statement)
+        # Only what this stage adds on top of the previous one
+        added = {name: t for name, t in times.items() if name not in previous}
+        previous = times
+
+        total = sum(own for own, _ in added.values())
+        print(f"\n{title}: {len(added)} modules, {total:.1f} ms")
+
+        print(f"  {'package':<28}{'self ms':>10}")
+        packages = sorted(top_level(added).items(), key=lambda kv: kv[1], reverse=True)
+        for package, own in packages[:args.top]:
+            print(f"  {package:<28}{own:>10.1f}")
+
+        print(f"  {'module':<40}{'cumulative ms':>15}")
+        modules = sorted(added.items(), key=lambda kv: kv[1][1], reverse=True)
+        for name, (_, cumulative) in modules[:args.top]:
+            print(f"  {name:<40}{cumulative:>15.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Scheduler Simulation Harness
+Runs a simulated day of refresh scheduling against a fake monotonic clock
+
+Checks that sources run on their intervals, back off while failing,
+recover afterwards, honour manual refreshes, never start a source again
+while its timed-out fetch still runs, and that the real loop stops
+promptly. Exits non-zero if any check fails.
+
+Run from the repository root:
+    python benchmarks/sim_scheduler.py
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import RefreshScheduler
+
+DAY = 24 * 3600
+
+class SimClock:
+    """Manually advanced monotonic clock"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+def simulate_day():
+    clock = SimClock()
+    # Inline fetches keep the simulation deterministic
+    scheduler = RefreshScheduler(clock=clock, rng=random.Random(42), max_workers=0)
+    runs = {'weather': [], 'news': [], 'stocks': []}
+    
+    # News provider is down between 10:00 and 12:00
+    def fetch_news():
+        runs['news'].append(clock.now)
+        if 10 * 3600 <= clock.now < 12 * 3600:
+            raise RuntimeError("simulated outage")
+        return ['item']
+    
+    def fetch_weather():
+        runs['weather'].append(clock.now)
+        return {'temperature': 1.0}
+    
+    def fetch_stocks():
+        runs['stocks'].append(clock.now)
+        return ['quote']
+    
+    def market_open():
+        hour = clock.now / 3600 % 24
+        return 9 <= hour < 17
+    
+    # Suppress per-failure prints from the scheduler
+    stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        scheduler.add_source('weather', fetch_weather, 30 * 60)
+        scheduler.add_source('news', fetch_news, 15 * 60)
+        scheduler.add_source('stocks', fetch_stocks, 30 * 60, condition=market_open)
+        
+        wakeups = 0
+        manual_at = 15 * 3600 + 123
+        manual_done = False
+        start = time.perf_counter()
+        
+        while True:
+            deadline = scheduler.next_deadline()
+            if not manual_done and deadline > manual_at:
+                # Manual refresh arrives between deadlines
+                clock.now = manual_at
+                scheduler.refresh_all()
+                manual_done = True
+                continue
+            if deadline >= DAY:
+                break
+            clock.now = deadline
+            wakeups += 1
+            scheduler.run_pending()
+        
+        elapsed = (time.perf_counter() - start) * 1000
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    
+    return runs, wakeups, elapsed, manual_at
+
+def check_prompt_stop():
+    """Real-time check: stop() ends a loop sleeping on a long deadline"""
+    scheduler = RefreshScheduler()
+    scheduler.add_source('slow', lambda: None, 3600)
+    scheduler.start()
+    time.sleep(0.05)
+    
+    start = time.perf_counter()
+    scheduler.stop()
+    scheduler._thread.join(timeout=5)
+    return time.perf_counter() - start, not scheduler._thread.is_alive()
+
+def check_hung_fetch():
+    """A fetch hanging past its timeout is not started again until it returns"""
+    clock = SimClock()
+    scheduler = RefreshScheduler(clock=clock, max_workers=2)
+    release = threading.Event()
+    calls = []
+    
+    def fetch():
+        calls.append(clock.now)
+        release.wait(5)
+        return ['item']
+    
+    scheduler.add_source('hung', fetch, 60, timeout=10)
+    stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        scheduler.run_pending()
+        while not calls:
+            time.sleep(0.001)
+        clock.now = 11
+        scheduler.expire_timeouts()
+        # Well past any backoff: the source is due again while still hung
+        clock.now = 10000
+        scheduler.request('hung')
+        scheduler.run_pending()
+        skipped = len(calls) == 1 and scheduler.status()['hung']['hung']
+        release.set()
+        scheduler.stop(timeout=5)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return skipped
+
+def main():
+    failures = []
+    
+    def check(name, ok):
+        print(f"  [{'ok' if ok else 'FAIL'}] {name}")
+        if not ok:
+            failures.append(name)
+    
+    runs, wakeups, elapsed, manual_at = simulate_day()
+    
+    print(f"Simulated 24 h in {elapsed:.1f} ms with {wakeups} wakeups")
+    for name, times in runs.items():
+        print(f"  {name:<8} {len(times)} fetches")
+    
+    news = runs['news']
+    gaps = [b - a for a, b in zip(news, news[1:])]
+    outage_gaps = [g for a, g in zip(news, gaps) if 10 * 3600 <= a < 12 * 3600]
+    normal_gaps = [g for a, g in zip(news, gaps) if a < 10 * 3600]
+    
+    check("simulation runs in under 1 s", elapsed < 1000)
+    check("weather runs about every 30 min", 44 <= len(runs['weather']) <= 54)
+    check("news gaps stay within jitter of 15 min",
+          all(0.9 * 900 <= g <= 1.1 * 900 for g in normal_gaps))
+    check("news backs off exponentially during outage",
+          len(outage_gaps) >= 3 and all(b > a for a, b in zip(outage_gaps, outage_gaps[1:3])))
+    check("news recovers after outage",
+          any(t >= 12 * 3600 for t in news))
+    check("manual refresh runs every source immediately",
+          all(manual_at in times for times in runs.values()))
+    
+    check("a hung fetch is not started twice", check_hung_fetch())
+    
+    stop_time, stopped = check_prompt_stop()
+    check(f"stop() ends the loop promptly ({stop_time * 1000:.1f} ms)",
+          stopped and stop_time < 0.5)
+    
+    if failures:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
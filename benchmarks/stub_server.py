@@ -0,0 +1,227 @@
+"""
+Stub Provider Server
+Local HTTP server serving canned responses with configurable latency,
+errors and conditional-GET (304) behaviour
+
+provider_routes() stands in for OpenWeatherMap, the RSS feeds and a
+quote endpoint. Run on its own to serve them in a separate process:
+    python benchmarks/stub_server.py --latency 0.05 --error-rate 0.1
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+class StubServer:
+    """Serves routes on 127.0.0.1 after a delay
+
+    Routes map a path to (content_type, body), or to a callable taking
+    the query dict and returning one. latency is seconds, or a
+    {path: seconds} dict. A share error_rate of requests fail with 500.
+    With etags=True responses carry an ETag and a matching If-None-Match
+    gets 304 Not Modified.
+    """
+
+    def __init__(self, routes, latency=0.0, error_rate=0.0, etags=False, seed=0):
+        self.routes = routes
+        self.latency = latency
+        self.error_rate = error_rate
+        self.etags = etags
+        self.requests = 0
+        self.errors = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def _delay(self, path):
+        if isinstance(self.latency, dict):
+            return self.latency.get(path, 0.0)
+        return self.latency
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                path, _, query = self.path.partition('?')
+                with stub._lock:
+                    stub.requests += 1
+                    failed = stub.error_rate and stub._rng.random() < stub.error_rate
+                delay = stub._delay(path)
+                if delay:
+                    time.sleep(delay)
+
+                if path not in stub.routes:
+                    self.send_error(404)
+                    return
+                if failed:
+                    with stub._lock:
+                        stub.errors += 1
+                    self.send_error(500)
+                    return
+
+                route = stub.routes[path]
+                if callable(route):
+                    route = route({k: v[0] for k, v in parse_qs(query).items()})
+                content_type, body = route
+
+                headers = {'Content-Type': content_type}
+                if stub.etags:
+                    etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+                    headers['ETag'] = etag
+                    if self.headers.get('If-None-Match') == etag:
+                        with stub._lock:
+                            stub.not_modified += 1
+                        self.send_response(304)
+                        self.send_header('ETag', etag)
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+
+                self.send_response(200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with stub._lock:
+                    stub.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, port=0):
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+# Canned providers
+
+def _city_id(city):
+    """Stable fake OpenWeatherMap ID of a city name"""
+    return zlib.crc32(city.lower().encode()) % 10_000_000
+
+def _weather_record(city):
+    n = _city_id(city)
+    return {
+        'id': n,
+        'name': city,
+        'main': {'temp': n % 40 - 20 + 0.5, 'feels_like': n % 40 - 24.0,
+                 'humidity': n % 100, 'temp_min': n % 40 - 22.0, 'temp_max': n % 40 - 18.0},
+        'weather': [{'icon': '13d', 'description': 'lumisadetta'}],
+        'wind': {'speed': n % 15}
+    }
+
+def _json(data):
+    return ('application/json', json.dumps(data).encode())
+
+def provider_routes(feeds=('yle', 'hs'), items=20, new_items=0):
+    """Routes mimicking OpenWeatherMap, RSS feeds and a quote endpoint
+
+    /data/2.5/weather?q=, /data/2.5/group?id=, /data/2.5/forecast?q=,
+    /rss/<feed> and /quotes?symbols=a,b. With new_items every feed
+    request publishes that many new items on top, so feeds keep
+    changing like real news feeds.
+    """
+    counter = {'published': 0}
+    cities = {}  # id -> name, learned from by-name requests like the real API's IDs
+    lock = threading.Lock()
+
+    def weather(query):
+        record = _weather_record(query.get('q', 'Helsinki'))
+        with lock:
+            cities[record['id']] = record['name']
+        return _json(record)
+
+    def group(query):
+        ids = [int(i) for i in query.get('id', '').split(',') if i]
+        with lock:
+            found = [_weather_record(cities[i]) for i in ids if i in cities]
+        return _json({'cnt': len(found), 'list': found})
+
+    def forecast(query):
+        city = query.get('q', 'Helsinki')
+        start = int(time.time()) // 10800 * 10800
+        slots = [{
+            'dt': start + i * 10800,
+            'main': {'temp': i % 8 - 4.0, 'temp_min': i % 8 - 5.0, 'temp_max': i % 8 - 3.0},
+            'weather': [{'icon': ('01d', '03d', '10n', '13n')[i % 4]}]
+        } for i in range(40)]
+        return _json({'city': {'name': city, 'timezone': 7200}, 'list': slots})
+
+    def feed(name):
+        def route(query):
+            with lock:
+                counter['published'] += new_items
+                newest = counter['published'] + items
+            entries = "".join(
+                f"<item><title>{name} uutinen {n}</title>"
+                f"<link>http://stub/{name}/{n}</link><guid>{name}-{n}</guid>"
+                f"<pubDate>Mon, 06 Jan 2025 08:{n % 60:02d}:00 +0200</pubDate></item>"
+                for n in range(newest, newest - items, -1))
+            body = (f"<?xml version='1.0'?><rss version='2.0'><channel><title>{name}</title>"
+                    f"{entries}</channel></rss>").encode()
+            return ('application/rss+xml', body)
+        return route
+
+    def quotes(query):
+        symbols = [s for s in query.get('symbols', '').split(',') if s]
+        return _json([{'symbol': s, 'price': 10.0 + len(s), 'previous': 9.5 + len(s)}
+                      for s in symbols])
+
+    routes = {
+        '/data/2.5/weather': weather,
+        '/data/2.5/group': group,
+        '/data/2.5/forecast': forecast,
+        '/quotes': quotes
+    }
+    for name in feeds:
+        routes[f'/rss/{name}'] = feed(name)
+    return routes
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the canned providers")
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds per request")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of 500s")
+    parser.add_argument('--no-etags', action='store_true', help="never answer 304")
+    parser.add_argument('--new-items', type=int, default=0, help="new feed items per request")
+    args = parser.parse_args()
+
+    server = StubServer(provider_routes(new_items=args.new_items), args.latency,
+                        args.error_rate, etags=not args.no_etags).start(args.port)
+    print(server.url, flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
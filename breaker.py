@@ -0,0 +1,195 @@
+"""
+Circuit Breakers
+Stop calling data sources and hosts that keep failing, and probe whether the network is up
+"""
+
+import random
+import socket
+import threading
+import time
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(Exception):
+    """A call was skipped because its breaker is open"""
+
+class CircuitBreaker:
+    """Closed, open and half-open states for one source or host
+
+    After threshold consecutive failures the breaker opens and calls are
+    refused until the reset delay has passed. The delay doubles with every
+    failure past the threshold, up to max_reset, with +/- jitter. Once it
+    has passed, one call is let through half-open: success closes the
+    breaker, failure opens it again for longer.
+    """
+
+    def __init__(self, name, threshold=3, reset_after=30, max_reset=1800, jitter=0.2,
+                 clock=time.monotonic, rng=None):
+        self.name = name
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.max_reset = max_reset
+        self.jitter = jitter
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.state = CLOSED
+        self.failures = 0
+        self.retry_at = 0.0
+        self.last_error = None
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go ahead now; an open breaker past its delay turns half-open"""
+        with self._lock:
+            if self.state == OPEN and self.clock() >= self.retry_at:
+                self.state = HALF_OPEN
+                return True
+            if self.state == CLOSED:
+                return True
+            self.skipped += 1
+            return False
+
+    def is_open(self):
+        """Whether a call now would be refused; unlike allow() this changes nothing"""
+        with self._lock:
+            return self.state == HALF_OPEN or (self.state == OPEN
+                                               and self.clock() < self.retry_at)
+
+    def probe(self):
+        """Let the next call through now, e.g. for a manual refresh
+
+        Also hands back a half-open call that ended without a verdict.
+        """
+        with self._lock:
+            if self.state != CLOSED:
+                self.state = OPEN
+                self.retry_at = self.clock()
+
+    def success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.last_error = None
+
+    def failure(self, error=None):
+        """Count a failed call; returns seconds until the next call is allowed"""
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error) if error else None
+            if self.state != HALF_OPEN and self.failures < self.threshold:
+                return 0.0
+            delay = min(self.reset_after * 2 ** (self.failures - self.threshold),
+                        self.max_reset)
+            delay *= self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+            self.state = OPEN
+            self.retry_at = self.clock() + delay
+            return delay
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go ahead"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} is down, retrying in "
+                                   f"{max(0.0, self.retry_at - self.clock()):.0f} s")
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'retry_in': max(0.0, self.retry_at - self.clock()) if self.state == OPEN else 0.0,
+                'skipped': self.skipped,
+                'last_error': self.last_error
+            }
+
+class BreakerBoard:
+    """Circuit breakers created on first use, one per name"""
+
+    def __init__(self, **options):
+        self.options = options
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, **self.options)
+            return breaker
+
+    def as_dict(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.as_dict() for breaker in breakers}
+
+class NetworkMonitor:
+    """Cheap, cached answer to whether the device is online at all
+
+    A probe is a TCP connect with a short timeout to the hosts that most
+    recently answered one of the app's own requests, so a network that
+    blocks some public service but reaches the app's sources is not taken
+    for down. Until some host has answered there is nothing to probe and
+    the network counts as up. Results are kept for ttl seconds, so a
+    burst of failing requests costs at most one probe. While the network
+    is known to be down, requests can be skipped instead of each waiting
+    for its own connect timeout.
+    """
+
+    MAX_PROBES = 2
+
+    def __init__(self, timeout=1.5, ttl=15, clock=time.monotonic):
+        self.probes = deque(maxlen=self.MAX_PROBES)  # (host, port), newest last
+        self.timeout = timeout
+        self.ttl = ttl
+        self.clock = clock
+        self.up = True
+        self.checked_at = None
+        self._lock = threading.Lock()
+
+    def _probe(self):
+        if not self.probes:
+            # Unknown is not down
+            return True
+        for address in reversed(self.probes):
+            try:
+                socket.create_connection(address, timeout=self.timeout).close()
+                return True
+            except OSError:
+                continue
+        return False
+
+    def check(self):
+        """Probe now unless the last probe is recent; returns whether the network is up"""
+        with self._lock:
+            if self.checked_at is not None and self.clock() - self.checked_at < self.ttl:
+                return self.up
+            self.up = self._probe()
+            self.checked_at = self.clock()
+            return self.up
+
+    def known_down(self):
+        """True only while a recent probe found the network down; never probes"""
+        with self._lock:
+            return (not self.up and self.checked_at is not None
+                    and self.clock() - self.checked_at < self.ttl)
+
+    def mark_up(self, address=None):
+        """A request got an answer, so the network is up; address=(host, port) answered it"""
+        with self._lock:
+            self.up = True
+            if address is None or (self.probes and self.probes[-1] == address):
+                return
+            if address in self.probes:
+                self.probes.remove(address)
+            self.probes.append(address)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'up': self.up,
+                'probes': [f"{host}:{port}" for host, port in self.probes],
+                'checked_ago': None if self.checked_at is None else self.clock() - self.checked_at
+            }
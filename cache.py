@@ -0,0 +1,226 @@
+"""
+Local Data Cache
+SQLite-backed cache for weather, news and stock data
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (source, key)
+);
+CREATE INDEX IF NOT EXISTS idx_cache_fetched_at ON cache (fetched_at);
+CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache (expires_at);
+
+CREATE TABLE IF NOT EXISTS feed_items (
+    feed TEXT NOT NULL,
+    guid TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    published_at REAL NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (feed, guid)
+);
+CREATE INDEX IF NOT EXISTS idx_feed_items_seen_at ON feed_items (feed, seen_at);
+CREATE INDEX IF NOT EXISTS idx_feed_items_published_at ON feed_items (published_at);
+
+CREATE TABLE IF NOT EXISTS budgets (
+    owner TEXT NOT NULL,
+    window TEXT NOT NULL,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (owner, window)
+);
+"""
+
+class CacheStore:
+    """Cache entries keyed by (source, key) in one WAL-mode SQLite database"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _connection(self):
+        """Get the SQLite connection owned by the calling thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Each thread keeps its own connection; close() may run from any thread
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get_entry(self, source, key='default'):
+        """Get cached entry with its timestamps, or None"""
+        row = self._connection().execute(
+            "SELECT payload, fetched_at, expires_at FROM cache WHERE source = ? AND key = ?",
+            (source, key)
+        ).fetchone()
+        if row is None:
+            return None
+
+        payload, fetched_at, expires_at = row
+        return {
+            'data': json.loads(payload),
+            'fetched_at': fetched_at,
+            'expires_at': expires_at
+        }
+
+    def get(self, source, key='default', allow_expired=True):
+        """Get cached data; expired entries are returned unless allow_expired is False"""
+        entry = self.get_entry(source, key)
+        if entry is None:
+            return None
+        if not allow_expired and entry['expires_at'] <= time.time():
+            return None
+        return entry['data']
+
+    def put(self, source, data, ttl, key='default'):
+        """Store data for (source, key), valid for ttl seconds"""
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (source, key, payload, fetched_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (source, key, json.dumps(data, ensure_ascii=False), now, now + ttl)
+        )
+        conn.commit()
+
+    def last_fetched_at(self):
+        """Unix time of the newest write of any entry, or 0"""
+        row = self._connection().execute("SELECT MAX(fetched_at) FROM cache").fetchone()
+        return row[0] or 0
+
+    def purge_expired(self, older_than=0):
+        """Delete entries that expired more than older_than seconds ago"""
+        conn = self._connection()
+        cursor = conn.execute("DELETE FROM cache WHERE expires_at < ?",
+                              (time.time() - older_than,))
+        conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        """Close every connection opened by this store"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+class FeedIndex:
+    """Persistent per-feed index of seen items, bounded to max_items per feed"""
+
+    def __init__(self, store, max_items=50):
+        self.store = store
+        self.max_items = max_items
+
+    def add(self, feed, items):
+        """Store items (dicts with guid and published_at), evicting the oldest seen"""
+        if not items:
+            return
+        now = time.time()
+        # Oldest first, so within one batch rowid order follows item age
+        items = sorted(items, key=lambda item: item['published_at'])
+        conn = self.store._connection()
+        conn.executemany(
+            "INSERT OR IGNORE INTO feed_items (feed, guid, payload, published_at, seen_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(feed, item['guid'], json.dumps(item, ensure_ascii=False),
+              item['published_at'], now) for item in items]
+        )
+        conn.execute(
+            "DELETE FROM feed_items WHERE feed = ? AND rowid NOT IN ("
+            "SELECT rowid FROM feed_items WHERE feed = ? "
+            "ORDER BY seen_at DESC, rowid DESC LIMIT ?)",
+            (feed, feed, self.max_items)
+        )
+        conn.commit()
+
+    def guids(self, feed):
+        """Every stored GUID of feed"""
+        rows = self.store._connection().execute(
+            "SELECT guid FROM feed_items WHERE feed = ?", (feed,)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def latest(self, limit):
+        """Newest items across all feeds"""
+        rows = self.store._connection().execute(
+            "SELECT payload FROM feed_items ORDER BY published_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+class RequestBudget:
+    """Persistent token buckets limiting requests per API key
+
+    limits maps a window name to (requests, seconds), e.g. 60 per minute
+    and 1000 per day. Each window is a bucket of that many tokens that
+    refills continuously; a request needs a token from every window.
+    Buckets are stored under a hash of the key, never the key itself.
+    """
+
+    def __init__(self, store, limits):
+        self.store = store
+        self.limits = dict(limits)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def owner(api_key):
+        return hashlib.sha1(api_key.encode('utf-8')).hexdigest()[:16]
+
+    def _buckets(self, conn, owner, now):
+        """Current token count per window, refilled up to now"""
+        rows = conn.execute(
+            "SELECT window, tokens, updated_at FROM budgets WHERE owner = ?", (owner,)
+        ).fetchall()
+        rows = {window: (tokens, updated_at) for window, tokens, updated_at in rows}
+        buckets = {}
+        for window, (capacity, seconds) in self.limits.items():
+            tokens, updated_at = rows.get(window, (capacity, now))
+            refill = max(0.0, now - updated_at) * capacity / seconds
+            buckets[window] = min(capacity, tokens + refill)
+        return buckets
+
+    def acquire(self, api_key, cost=1, now=None):
+        """Take cost tokens from every window; False (and nothing taken) if any is short"""
+        now = time.time() if now is None else now
+        owner = self.owner(api_key)
+        with self._lock:
+            conn = self.store._connection()
+            buckets = self._buckets(conn, owner, now)
+            if any(tokens < cost for tokens in buckets.values()):
+                return False
+            conn.executemany(
+                "INSERT OR REPLACE INTO budgets (owner, window, tokens, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(owner, window, tokens - cost, now) for window, tokens in buckets.items()]
+            )
+            conn.commit()
+            return True
+
+    def remaining(self, api_key, now=None):
+        """{window: {'remaining', 'limit', 'seconds'}} for api_key"""
+        now = time.time() if now is None else now
+        with self._lock:
+            buckets = self._buckets(self.store._connection(), self.owner(api_key), now)
+        return {
+            window: {'remaining': int(buckets[window]), 'limit': capacity, 'seconds': seconds}
+            for window, (capacity, seconds) in self.limits.items()
+        }
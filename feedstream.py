@@ -0,0 +1,121 @@
+"""
+Streaming Feed Reader
+Incremental RSS/Atom parsing that stops once it has the items it needs
+"""
+
+import calendar
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+ITEM_TAGS = ('item', 'entry')
+
+def _local(tag):
+    """Tag name without its XML namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+def _parse_date(text):
+    """RFC 822 (RSS) or ISO 8601 (Atom) date as a Unix timestamp, or None"""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        return parsedate_to_datetime(text).timestamp()
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+def _entry_from_element(elem):
+    """Flatten an <item> or <entry> element into an entry dict"""
+    fields = {}
+    for child in elem:
+        name = _local(child.tag)
+        if name == 'link' and child.get('href'):
+            # Atom: prefer the alternate link
+            if child.get('rel', 'alternate') == 'alternate' or 'link' not in fields:
+                fields['link'] = child.get('href')
+        elif name not in fields:
+            fields[name] = (child.text or '').strip()
+
+    about = elem.get('{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about')
+    published = (fields.get('pubDate') or fields.get('published')
+                 or fields.get('updated') or fields.get('date', ''))
+    return {
+        'guid': fields.get('guid') or fields.get('id') or about
+                or fields.get('link') or fields.get('title'),
+        'title': fields.get('title', ''),
+        'link': fields.get('link', ''),
+        'published': published,
+        'published_at': _parse_date(published)
+    }
+
+def _entry_from_feedparser(entry):
+    published = entry.get('published_parsed') or entry.get('updated_parsed')
+    return {
+        'guid': entry.get('id') or entry.get('link') or entry.get('title'),
+        'title': entry.get('title', ''),
+        'link': entry.get('link', ''),
+        'published': entry.get('published', entry.get('updated', '')),
+        'published_at': calendar.timegm(published) if published else None
+    }
+
+def _collect(entries, limit, seen):
+    """Take entries until limit or the first already seen GUID"""
+    items = []
+    guids = set()
+    for entry in entries:
+        guid = entry['guid']
+        if not guid or guid in guids:
+            continue
+        if guid in seen:
+            # Feeds list newest first; everything after this is old
+            break
+        guids.add(guid)
+        items.append(entry)
+        if len(items) >= limit:
+            break
+    return items
+
+def _stream_entries(parser, chunks, body):
+    """Yield entries as their closing tags arrive; body collects raw chunks"""
+    stack = []
+    for chunk in chunks:
+        body.append(chunk)
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'start':
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            if _local(elem.tag) in ITEM_TAGS:
+                yield _entry_from_element(elem)
+                # Drop the finished item so the tree never grows
+                if stack:
+                    stack[-1].remove(elem)
+    parser.close()
+
+def read_feed(chunks, limit, seen=()):
+    """Parse up to limit newest entries from an iterable of byte chunks
+
+    Stops reading at limit entries or at the first GUID in seen. Malformed
+    XML (e.g. HTML entities) falls back to feedparser on the full body.
+    Entries are dicts with guid, title, link, published and published_at
+    (Unix timestamp or None).
+    """
+    chunks = iter(chunks)
+    body = []
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    try:
+        return _collect(_stream_entries(parser, chunks, body), limit, seen)
+    except ET.ParseError:
+        pass
+
+    # Read the rest of the document and let feedparser cope with it
+    import feedparser
+    body.extend(chunks)
+    feed = feedparser.parse(b''.join(body))
+    return _collect((_entry_from_feedparser(e) for e in feed.entries), limit, seen)
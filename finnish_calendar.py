@@ -0,0 +1,331 @@
+"""
+Finnish Calendar
+Per-year day index of holidays, name days and day flags
+"""
+
+import json
+import os
+import threading
+from array import array
+from collections import namedtuple
+from datetime import date, timedelta
+
+NAME_DAYS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nimipaivat.json")
+
+FORMAT_VERSION = 1
+
+# Day flags
+WEEKEND = 1
+HOLIDAY = 2
+
+DayInfo = namedtuple('DayInfo', ['date', 'holiday', 'name_days', 'flags'])
+
+FIXED_HOLIDAYS = {
+    (1, 1): "Uudenvuodenpäivä", (1, 6): "Loppiainen", (5, 1): "Vappu",
+    (12, 6): "Itsenäisyyspäivä", (12, 24): "Jouluaatto",
+    (12, 25): "Joulupäivä", (12, 26): "Tapaninpäivä"
+}
+
+def easter_sunday(year):
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+def first_weekday_from(start, weekday):
+    """First given weekday (0 = Monday) on or after start"""
+    return start + timedelta(days=(weekday - start.weekday()) % 7)
+
+def midsummer_eve(year):
+    """Juhannusaatto: the Friday between 19 and 25 June"""
+    return first_weekday_from(date(year, 6, 19), 4)
+
+def finnish_holidays(year):
+    """Every Finnish holiday of year, movable feasts included, as {date: name}"""
+    easter = easter_sunday(year)
+    holidays = {date(year, month, day): name for (month, day), name in FIXED_HOLIDAYS.items()}
+    holidays.update({
+        easter - timedelta(days=2): "Pitkäperjantai",
+        easter: "Pääsiäispäivä",
+        easter + timedelta(days=1): "2. pääsiäispäivä",
+        easter + timedelta(days=39): "Helatorstai",
+        easter + timedelta(days=49): "Helluntaipäivä",
+        midsummer_eve(year): "Juhannusaatto",
+        midsummer_eve(year) + timedelta(days=1): "Juhannuspäivä",
+        first_weekday_from(date(year, 10, 31), 5): "Pyhäinpäivä"
+    })
+    return holidays
+
+def load_name_days(path=NAME_DAYS_FILE):
+    """Read nimipaivat.json into {(month, day): "Name, Name"}"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return {
+            (int(item["month"]), int(item["day"])): ", ".join(item["names"])
+            for item in data
+        }
+    except Exception as e:
+        print(f"Name days file not found: {e}")
+        return {}
+
+def leap_day_number(month, day):
+    """0-based day number in a leap year, so 29.2. has its own slot"""
+    return date(2000, month, day).timetuple().tm_yday - 1
+
+class NameDayStore:
+    """Name days compiled from nimipaivat.json into a compact binary file
+
+    The file holds 367 uint32 offsets into one UTF-8 blob, one slot per
+    day of a leap year, behind a header naming the source file's hash.
+    Nothing is read until the first lookup, and the JSON is parsed only
+    when the source has changed since the last compile.
+    """
+
+    def __init__(self, source=NAME_DAYS_FILE, cache_dir=None):
+        self.source = source
+        self.cache_dir = cache_dir
+        self._offsets = None
+        self._blob = b''
+        self._hash = None
+        self._lock = threading.Lock()
+
+    def _compiled_path(self):
+        return os.path.join(self.cache_dir, "namedays.bin")
+
+    def _source_info(self):
+        try:
+            stat = os.stat(self.source)
+        except OSError:
+            return None
+        return {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+    def _hash_source(self):
+        # Imported here: the warm path trusts size and mtime and never hashes
+        import hashlib
+        try:
+            with open(self.source, 'rb') as f:
+                return hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return "missing"
+
+    def _read_compiled(self, info):
+        """Load the compiled file if it matches the source; returns success"""
+        try:
+            with open(self._compiled_path(), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False
+
+        header, _, body = data.partition(b'\n')
+        try:
+            meta = json.loads(header.decode('utf-8'))
+        except ValueError:
+            return False
+        source = meta.get('source') or {}
+        if meta.get('version') != FORMAT_VERSION or info is None:
+            return False
+        if source.get('size') != info['size'] or len(body) < 367 * 4:
+            return False
+        if source.get('mtime') != info['mtime'] and source.get('sha1') != self._hash_source():
+            # Only hash the source when its timestamp moved
+            return False
+
+        offsets = array('I')
+        offsets.frombytes(body[:367 * 4])
+        self._publish(offsets, body[367 * 4:], source['sha1'])
+        return True
+
+    def _compile(self, info):
+        names = [b''] * 366
+        for (month, day), joined in load_name_days(self.source).items():
+            try:
+                names[leap_day_number(month, day)] = joined.encode('utf-8')
+            except ValueError:
+                continue
+
+        offsets = array('I', [0])
+        for encoded in names:
+            offsets.append(offsets[-1] + len(encoded))
+        blob = b''.join(names)
+        self._publish(offsets, blob, self._hash_source())
+
+        if not self.cache_dir or info is None:
+            return
+        header = json.dumps({
+            'version': FORMAT_VERSION,
+            'source': dict(info, sha1=self._hash)
+        }).encode('utf-8')
+        try:
+            tmp_path = self._compiled_path() + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(header + b'\n' + offsets.tobytes() + blob)
+            os.replace(tmp_path, self._compiled_path())
+        except OSError as e:
+            print(f"Name day cache write error: {e}")
+
+    def _publish(self, offsets, blob, source_hash):
+        # Lookups check _offsets without the lock, so it is assigned last
+        self._blob = blob
+        self._hash = source_hash
+        self._offsets = offsets
+
+    def _ensure(self):
+        if self._offsets is not None:
+            return
+        with self._lock:
+            if self._offsets is not None:
+                return
+            info = self._source_info()
+            if not (self.cache_dir and self._read_compiled(info)):
+                self._compile(info)
+
+    @property
+    def source_hash(self):
+        """Content hash of the source file; keys caches derived from it"""
+        self._ensure()
+        return self._hash
+
+    def get(self, month, day):
+        """Names of a date joined with commas, or ''"""
+        self._ensure()
+        try:
+            n = leap_day_number(month, day)
+        except ValueError:
+            return ""
+        return self._blob[self._offsets[n]:self._offsets[n + 1]].decode('utf-8')
+
+class YearIndex:
+    """366 day records of one year stored as parallel arrays
+
+    holiday_ids and name_ids index into string tables (0 = none); flags
+    holds WEEKEND/HOLIDAY bits. Day n is the n:th day of the year.
+    """
+
+    def __init__(self, year, holidays, names, holiday_ids, name_ids, flags):
+        self.year = year
+        self.holidays = holidays
+        self.names = names
+        self.holiday_ids = holiday_ids
+        self.name_ids = name_ids
+        self.flags = flags
+        self._start = date(year, 1, 1).toordinal()
+
+    @classmethod
+    def build(cls, year, name_days):
+        """name_days is a NameDayStore (anything with get(month, day))"""
+        holiday_dates = finnish_holidays(year)
+        holidays = [""]
+        names = [""]
+        holiday_ids = array('H', bytes(2 * 366))
+        name_ids = array('H', bytes(2 * 366))
+        flags = array('B', bytes(366))
+
+        day = date(year, 1, 1)
+        while day.year == year:
+            n = day.timetuple().tm_yday - 1
+            holiday = holiday_dates.get(day)
+            if holiday:
+                holiday_ids[n] = len(holidays)
+                holidays.append(holiday)
+                flags[n] |= HOLIDAY
+            name = name_days.get(day.month, day.day)
+            if name:
+                name_ids[n] = len(names)
+                names.append(name)
+            if day.weekday() >= 5:
+                flags[n] |= WEEKEND
+            day += timedelta(days=1)
+
+        return cls(year, holidays, names, holiday_ids, name_ids, flags)
+
+    def day(self, day):
+        n = day.toordinal() - self._start
+        return DayInfo(day, self.holidays[self.holiday_ids[n]],
+                       self.names[self.name_ids[n]], self.flags[n])
+
+    def to_bytes(self, stamp):
+        header = json.dumps({
+            'version': FORMAT_VERSION, 'year': self.year, 'source': stamp,
+            'holidays': self.holidays, 'names': self.names
+        }, ensure_ascii=False).encode('utf-8')
+        return (header + b'\n' + self.holiday_ids.tobytes()
+                + self.name_ids.tobytes() + self.flags.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data, stamp):
+        """Decode a cached year; None if it is stale or unreadable"""
+        header, _, body = data.partition(b'\n')
+        meta = json.loads(header.decode('utf-8'))
+        if meta.get('version') != FORMAT_VERSION or meta.get('source') != stamp:
+            return None
+        if len(body) != 366 * 5:
+            return None
+        holiday_ids = array('H')
+        holiday_ids.frombytes(body[:732])
+        name_ids = array('H')
+        name_ids.frombytes(body[732:1464])
+        flags = array('B', body[1464:])
+        return cls(meta['year'], meta['holidays'], meta['names'],
+                   holiday_ids, name_ids, flags)
+
+class CalendarIndex:
+    """Lazily built, disk-cached YearIndex per year"""
+
+    def __init__(self, name_days, cache_dir=None):
+        self.name_days = name_days
+        self.cache_dir = cache_dir
+        self._years = {}
+        self._lock = threading.Lock()
+
+    def _cache_path(self, year):
+        return os.path.join(self.cache_dir, f"calendar_{year}.bin")
+
+    def _load_year(self, year):
+        stamp = self.name_days.source_hash
+        if self.cache_dir:
+            try:
+                with open(self._cache_path(year), 'rb') as f:
+                    index = YearIndex.from_bytes(f.read(), stamp)
+                if index is not None:
+                    return index
+            except (OSError, ValueError):
+                pass
+
+        index = YearIndex.build(year, self.name_days)
+        if self.cache_dir:
+            try:
+                tmp_path = self._cache_path(year) + ".tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(index.to_bytes(stamp))
+                os.replace(tmp_path, self._cache_path(year))
+            except OSError as e:
+                print(f"Calendar cache write error: {e}")
+        return index
+
+    def year(self, year):
+        index = self._years.get(year)
+        if index is None:
+            with self._lock:
+                index = self._years.get(year)
+                if index is None:
+                    index = self._load_year(year)
+                    self._years[year] = index
+        return index
+
+    def day(self, day):
+        """DayInfo for a date"""
+        return self.year(day.year).day(day)
+
+    def week(self, day):
+        """DayInfo for Monday to Sunday of the ISO week containing day"""
+        monday = day - timedelta(days=day.weekday())
+        return [self.day(monday + timedelta(days=i)) for i in range(7)]
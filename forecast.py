@@ -0,0 +1,93 @@
+"""
+Weather Forecast
+5-day/3-hour forecasts downsampled into daily records stored as per-field arrays
+"""
+
+from array import array
+from datetime import date
+
+# OpenWeatherMap icon codes; icons are stored as indexes into this table
+ICON_CODES = (
+    "01d", "01n", "02d", "02n", "03d", "03n", "04d", "04n", "09d", "09n",
+    "10d", "10n", "11d", "11n", "13d", "13n", "50d", "50n"
+)
+_ICON_INDEX = {code: i for i, code in enumerate(ICON_CODES)}
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+class Forecast:
+    """Daily forecast: one array per field, one index per day
+
+    days holds date ordinals, low and high the daily minimum and maximum
+    temperatures, icons indexes into ICON_CODES.
+    """
+
+    __slots__ = ('city', 'days', 'low', 'high', 'icons')
+
+    def __init__(self, city, days, low, high, icons):
+        self.city = city
+        self.days = days
+        self.low = low
+        self.high = high
+        self.icons = icons
+
+    @classmethod
+    def from_owm(cls, data, city=None):
+        """Downsample an OpenWeatherMap /forecast response into daily records
+
+        Slots are grouped by local date using the city's UTC offset. The
+        day's icon is that of the slot closest to local noon.
+        """
+        offset = data.get('city', {}).get('timezone', 0)
+        days = array('I')
+        low = array('f')
+        high = array('f')
+        icons = array('B')
+        noon_distance = []
+
+        for slot in data.get('list', []):
+            local = slot['dt'] + offset
+            ordinal = EPOCH_ORDINAL + local // 86400
+            distance = abs(local % 86400 - 12 * 3600)
+            main = slot['main']
+            icon = _ICON_INDEX.get(slot['weather'][0]['icon'], 0)
+
+            if not days or days[-1] != ordinal:
+                days.append(ordinal)
+                low.append(main.get('temp_min', main['temp']))
+                high.append(main.get('temp_max', main['temp']))
+                icons.append(icon)
+                noon_distance.append(distance)
+                continue
+
+            low[-1] = min(low[-1], main.get('temp_min', main['temp']))
+            high[-1] = max(high[-1], main.get('temp_max', main['temp']))
+            if distance < noon_distance[-1]:
+                icons[-1] = icon
+                noon_distance[-1] = distance
+
+        name = city or data.get('city', {}).get('name', '')
+        return cls(name, days, low, high, icons)
+
+    def to_dict(self):
+        """Columnar form for the JSON data cache"""
+        return {
+            'city': self.city,
+            'days': self.days.tolist(),
+            'low': [round(t, 1) for t in self.low],
+            'high': [round(t, 1) for t in self.high],
+            'icons': self.icons.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['city'], array('I', data['days']), array('f', data['low']),
+                   array('f', data['high']), array('B', data['icons']))
+
+    def __len__(self):
+        return len(self.days)
+
+    def day(self, i):
+        """(date, low, high, icon code) of day i"""
+        return (date.fromordinal(self.days[i]), self.low[i], self.high[i],
+                ICON_CODES[self.icons[i]])
@@ -0,0 +1,212 @@
+"""
+Headless Dashboard
+Runs fetching, caching, scheduling and alerts as plain Python, without
+Kivy, and exposes the dashboard state as a JSON snapshot
+
+Examples:
+    python headless.py --once --settings settings.json
+    python headless.py --interval 60 --output /var/lib/infonaytto/snapshot.json
+    python headless.py --once --profile
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from scheduler import NOT_DUE
+from services import BackgroundService, DataManager, SettingsManager
+from worldclock import DEFAULT_WORLD_CLOCKS, WorldClock, parse_cities
+
+SOURCES = ('weather', 'news', 'stocks')
+
+class HeadlessDashboard:
+    """The app's data pipeline without a UI
+
+    Owns the same DataManager and BackgroundService as the Kivy app. A UI
+    is just another subscriber; here the cache itself is the dashboard
+    state, read back by snapshot().
+    """
+
+    def __init__(self, settings=None, db_path=None):
+        self.settings = SettingsManager()
+        self.settings.settings.update(settings or {})
+        self.data_manager = DataManager(db_path)
+        self.service = BackgroundService(self.data_manager, self.settings)
+        self.world_clock = WorldClock(parse_cities(
+            self.settings.get('world_clocks', DEFAULT_WORLD_CLOCKS)))
+
+        # Unix time each source was last fetched or revalidated
+        self.updated_at = {}
+        self.failed = {}
+        # Unix time of runs that found the cached copy still fresh
+        self.checked = {}
+        self._reported = threading.Condition()
+        self.service.watch(self.on_revalidated)
+
+    def on_revalidated(self, source, ok):
+        with self._reported:
+            if ok is None:
+                self.checked[source] = time.time()
+            elif ok:
+                self.updated_at[source] = time.time()
+                self.failed.pop(source, None)
+            else:
+                self.failed[source] = time.time()
+            self._reported.notify_all()
+
+    def start(self):
+        self.service.start()
+
+    def stop(self, timeout=5):
+        """Stop refreshing; waits up to timeout seconds for fetches still running"""
+        self.service.stop(timeout)
+        self.data_manager.close(timeout)
+
+    def active_sources(self):
+        """Sources that will actually fetch; weather needs an API key"""
+        return [source for source in SOURCES
+                if source != 'weather' or self.settings.get('api_key')]
+
+    def refresh(self, timeout=120):
+        """Refresh every source now and wait until each has reported; returns success"""
+        started = time.time()
+        self.service.refresh_all()
+
+        def reported():
+            return all(max(self.updated_at.get(s, 0), self.failed.get(s, 0),
+                           self.checked.get(s, 0)) >= started
+                       for s in self.active_sources())
+        with self._reported:
+            return self._reported.wait_for(reported, timeout)
+
+    def refresh_inline(self):
+        """Fetch every source on the calling thread, bypassing the worker pool
+
+        cProfile only sees the thread it runs on, so profiling uses this.
+        """
+        scheduler = self.service.scheduler
+        for name in self.active_sources():
+            try:
+                data = scheduler.sources[name].fetch()
+            except Exception as e:
+                print(f"Refresh error ({name}): {e}", file=sys.stderr)
+                self.on_revalidated(name, False)
+                continue
+            if data is NOT_DUE:
+                self.on_revalidated(name, None)
+                continue
+            if data:
+                scheduler.publish(name, data)
+            self.on_revalidated(name, True)
+
+    def _source_state(self, source, data, fetched_at, now):
+        updated_at = max(self.updated_at.get(source, 0), fetched_at or 0) or None
+        return {
+            'data': data,
+            'updated_at': updated_at,
+            'age': now - updated_at if updated_at else None,
+            'stale': bool(updated_at) and self.service.is_stale(source, updated_at, now)
+        }
+
+    def snapshot(self, now=None):
+        """Dashboard state as JSON-serialisable dicts"""
+        now = time.time() if now is None else now
+        today = datetime.fromtimestamp(now).date()
+        cities = self.service.weather_cities()
+
+        weather = self.data_manager.load_weather(cities)
+        state = {
+            'generated_at': now,
+            'weather': self._source_state(
+                'weather', [entry['data'] for entry in weather],
+                min((entry['fetched_at'] for entry in weather), default=None), now)
+        }
+        for source in ('news', 'stocks'):
+            entry = self.data_manager.load_entry(source)
+            state[source] = self._source_state(
+                source, entry['data'] if entry else None,
+                entry['fetched_at'] if entry else None, now)
+
+        forecast = self.data_manager.load_forecast(cities[0])
+        state['forecast'] = forecast.to_dict() if forecast else None
+        state['calendar'] = [{
+            'date': day.date.isoformat(),
+            'holiday': day.holiday,
+            'name_days': day.name_days,
+            'flags': day.flags
+        } for day in self.data_manager.calendar.week(today)]
+        state['world_clocks'] = [{'city': city, 'time': text}
+                                 for city, text in self.world_clock.times(now)]
+        state['alerts'] = list(self.service.alerts)
+        state['http'] = self.data_manager.get_http_stats()
+        state['weather_budget'] = self.service.weather_budget()
+        state['diagnostics'] = self.service.diagnostics()
+        return state
+
+    def write_snapshot(self, path):
+        """Write snapshot() to path atomically"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the dashboard data pipeline without a UI")
+    parser.add_argument('--settings', help="JSON file of settings, e.g. api_key, default_city")
+    parser.add_argument('--db', help="SQLite cache path (default: data dir)")
+    parser.add_argument('--output', help="write the snapshot here instead of stdout")
+    parser.add_argument('--once', action='store_true', help="refresh once, snapshot, exit")
+    parser.add_argument('--interval', type=float, default=60,
+                        help="seconds between snapshots when running continuously")
+    parser.add_argument('--profile', action='store_true',
+                        help="run one refresh under cProfile and print the top functions")
+    args = parser.parse_args()
+
+    settings = {}
+    if args.settings:
+        with open(args.settings, encoding='utf-8') as f:
+            settings = json.load(f)
+
+    # Keep stdout for the snapshot; the pipeline logs with print()
+    snapshot_out = sys.stdout
+    sys.stdout = sys.stderr
+    dashboard = HeadlessDashboard(settings, args.db)
+
+    def emit():
+        if args.output:
+            dashboard.write_snapshot(args.output)
+        else:
+            json.dump(dashboard.snapshot(), snapshot_out, ensure_ascii=False, indent=2)
+            snapshot_out.write("\n")
+            snapshot_out.flush()
+
+    try:
+        if args.profile:
+            import cProfile
+            import pstats
+            profiler = cProfile.Profile()
+            profiler.enable()
+            dashboard.refresh_inline()
+            profiler.disable()
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+            return
+
+        dashboard.start()
+        if args.once:
+            dashboard.refresh()
+            emit()
+        else:
+            while True:
+                emit()
+                time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        dashboard.stop()
+
+if __name__ == '__main__':
+    main()
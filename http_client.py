@@ -0,0 +1,180 @@
+"""
+Shared HTTP Client
+One pooled requests session per process with conditional GET support
+"""
+
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from breaker import BreakerBoard, CircuitOpenError, NetworkMonitor
+
+USER_AGENT = "InfonayttoPro/1.0"
+
+class SourceStats:
+    """Request counters for one data source"""
+
+    def __init__(self):
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_received = 0
+        self.bytes_saved = 0
+
+    @property
+    def hit_rate(self):
+        """Share of requests answered with 304 Not Modified"""
+        return self.not_modified / self.requests if self.requests else 0.0
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'not_modified': self.not_modified,
+            'hit_rate': self.hit_rate,
+            'bytes_received': self.bytes_received,
+            'bytes_saved': self.bytes_saved
+        }
+
+class HttpClient:
+    """Keep-alive session that remembers ETag/Last-Modified per URL
+
+    Every host has a circuit breaker: connection errors, timeouts, 429s
+    and 5xx responses count as failures, and requests to a host whose
+    breaker is open fail at once with CircuitOpenError. Connection errors
+    while the network itself is down are not held against the host;
+    instead every request fails fast until the network is back.
+    """
+
+    # Responses that mean the host is in trouble rather than the request
+    FAILURE_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, max_hosts=10, per_host=4, timeout=10):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+
+        # pool_block caps open connections per host instead of growing past the limit
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=per_host,
+                              pool_block=True)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._validators = {}  # url -> {'etag', 'last_modified', 'length'}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.breakers = BreakerBoard()
+        self.network = NetworkMonitor()
+
+    @staticmethod
+    def _address(url):
+        """(host, port) of url, for network probes"""
+        parts = urlsplit(url)
+        return parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80)
+
+    def _send(self, url, breaker, **kwargs):
+        """session.get guarded by the network monitor and the host's breaker"""
+        if self.network.known_down():
+            raise CircuitOpenError("network is down")
+        breaker.check()
+        try:
+            response = self.session.get(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if isinstance(e, requests.ConnectionError) and not self.network.check():
+                # Not the host's fault; let the next call probe it again
+                breaker.probe()
+                raise
+            breaker.failure(e)
+            raise
+        except Exception as e:
+            breaker.failure(e)
+            raise
+
+        self.network.mark_up(self._address(url))
+        if response.status_code in self.FAILURE_STATUS:
+            breaker.failure(f"HTTP {response.status_code}")
+        else:
+            breaker.success()
+        return response
+
+    def get(self, url, params=None, source='default', conditional=True, timeout=None,
+            stream=False):
+        """GET url; a 304 response means the caller's cached copy is still valid
+
+        With stream=True the body is not read here; consume it through
+        iter_content() so received bytes are still counted.
+        """
+        request = requests.Request('GET', url, params=params).prepare()
+        cache_key = request.url
+
+        headers = {}
+        with self._lock:
+            validator = self._validators.get(cache_key) if conditional else None
+        if validator:
+            if validator.get('etag'):
+                headers['If-None-Match'] = validator['etag']
+            if validator.get('last_modified'):
+                headers['If-Modified-Since'] = validator['last_modified']
+
+        breaker = self.breakers.get(urlsplit(url).netloc)
+        response = self._send(url, breaker, params=params, headers=headers,
+                              timeout=timeout or self.timeout, stream=stream)
+
+        with self._lock:
+            stats = self._stats.setdefault(source, SourceStats())
+            stats.requests += 1
+
+            if response.status_code == 304 and validator:
+                stats.not_modified += 1
+                stats.bytes_saved += validator.get('length', 0)
+            elif response.ok:
+                if stream:
+                    length = int(response.headers.get('Content-Length') or 0)
+                else:
+                    length = len(response.content)
+                    stats.bytes_received += length
+
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if etag or last_modified:
+                    self._validators[cache_key] = {
+                        'etag': etag,
+                        'last_modified': last_modified,
+                        'length': length
+                    }
+
+        return response
+
+    def iter_content(self, response, source='default', chunk_size=16384):
+        """Yield body chunks of a streamed response, counting received bytes"""
+        for chunk in response.iter_content(chunk_size):
+            with self._lock:
+                self._stats.setdefault(source, SourceStats()).bytes_received += len(chunk)
+            yield chunk
+
+    def get_stats(self):
+        """Per-source counters as plain dicts"""
+        with self._lock:
+            return {source: stats.as_dict() for source, stats in self._stats.items()}
+
+    def is_down(self, url):
+        """Whether a request to url would be skipped right now"""
+        return self.network.known_down() or self.breakers.get(urlsplit(url).netloc).is_open()
+
+    def get_breakers(self):
+        """Breaker state per host as plain dicts"""
+        return self.breakers.as_dict()
+
+    def close(self):
+        self.session.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client():
+    """Get the process-wide HTTP client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -8,41 +8,35 @@ Main application file with all features integrated
 import kivy
 kivy.require('2.2.0')
 
-from kivy.app import App
 from kivy.clock import Clock
 from kivy.utils import platform
-from kivy.storage.jsonstore import JsonStore
 
-# KivyMD imports
+# KivyMD imports; dialog widgets are imported when the settings dialog opens
 from kivymd.app import MDApp
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.screen import MDScreen
 from kivymd.uix.screenmanager import MDScreenManager
 from kivymd.uix.card import MDCard
 from kivymd.uix.label import MDLabel
-from kivymd.uix.button import MDRaisedButton, MDIconButton
 from kivymd.uix.toolbar import MDTopAppBar
-from kivymd.uix.navigationdrawer import MDNavigationDrawer, MDNavigationDrawerMenu
 from kivymd.uix.scrollview import MDScrollView
-from kivymd.uix.dialog import MDDialog
-from kivymd.uix.textfield import MDTextField
-from kivymd.uix.selectioncontrol import MDSwitch
-from kivymd.uix.list import OneLineListItem, MDList
 
-import threading
-import requests
-import feedparser
-import yfinance as yf
-from datetime import datetime, timedelta, timezone
-import zoneinfo
-import json
-import sqlite3
-import os
-from pathlib import Path
+from datetime import datetime, timedelta
+import time
+
+# Network and data libraries (requests, feedparser, yfinance) are imported
+# lazily by the first fetch on a refresh worker thread, not here
 
 # Import our custom modules
 from services import BackgroundService, NotificationManager, SettingsManager, DataManager
 from services import ClockWidget, WeatherWidget
+from services import WEATHER_ICONS
+from rowpool import RowPool, assign
+from ticks import TickService
+from uiqueue import UpdateQueue, combine, prepend
+from worldclock import DEFAULT_WORLD_CLOCKS, WorldClock, parse_cities
+from finnish_calendar import WEEKEND
+from forecast import Forecast
 
 # Constants
 WEEKDAYS_FI = ["Ma", "Ti", "Ke", "To", "Pe", "La", "Su"]
@@ -51,61 +45,75 @@ WEEKDAY_NAMES_FI = {
     "Thursday": "Torstai", "Friday": "Perjantai", "Saturday": "Lauantai", 
     "Sunday": "Sunnuntai"
 }
+BREAKER_STATES_FI = {"closed": "OK", "open": "Katkaistu", "half_open": "Koestetaan"}
 
-WEATHER_ICONS = {
-    "01d": "☀️", "01n": "🌙", "02d": "🌤️", "02n": "☁️",
-    "03d": "☁️", "03n": "☁️", "04d": "☁️", "04n": "☁️",
-    "09d": "🌧️", "09n": "🌧️", "10d": "🌦️", "10n": "🌧️",
-    "11d": "⛈️", "11n": "⛈️", "13d": "❄️", "13n": "❄️",
-    "50d": "🌫️", "50n": "🌫️"
-}
-
-WEATHER_DESC_FI = {
-    "01d": "Selkeä", "01n": "Selkeä", "02d": "Melko selkeä", "02n": "Melko selkeä",
-    "03d": "Pilvistä", "03n": "Pilvistä", "04d": "Pilvistä", "04n": "Pilvistä",
-    "09d": "Sadetta", "09n": "Sadetta", "10d": "Sadekuuroja", "10n": "Sadekuuroja",
-    "11d": "Ukkosta", "11n": "Ukkosta", "13d": "Lunta", "13n": "Lunta",
-    "50d": "Sumua", "50n": "Sumua"
-}
-
-FINNISH_HOLIDAYS = {
-    (1, 1): "Uudenvuodenpäivä", (1, 6): "Loppiainen", (5, 1): "Vappu",
-    (12, 6): "Itsenäisyyspäivä", (12, 24): "Jouluaatto", 
-    (12, 25): "Joulupäivä", (12, 26): "Tapaninpäivä"
-}
-
-# Load name days
-FINNISH_NAME_DAYS = {}
-try:
-    with open("nimipaivat.json", encoding="utf-8") as f:
-        data = json.load(f)
-        FINNISH_NAME_DAYS = {
-            (int(item["month"]), int(item["day"])): ", ".join(item["names"])
-            for item in data
-        }
-except Exception as e:
-    print(f"Name days file not found: {e}")
+def format_age(seconds):
+    """Data age as short Finnish text, e.g. '25 min sitten'"""
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{max(minutes, 1)} min sitten"
+    if minutes < 24 * 60:
+        return f"{minutes // 60} h sitten"
+    return f"{minutes // (24 * 60)} pv sitten"
 
 class MainScreen(MDScreen):
     """Main dashboard screen with all info display components"""
     
-    def __init__(self, **kwargs):
+    NEWS_ROWS = 5
+    FORECAST_DAYS = 6
+    SNAPSHOT_INTERVAL = 5  # Seconds between snapshot writes after update batches
+    
+    def __init__(self, data_manager, settings_manager, background_service, **kwargs):
         super().__init__(**kwargs)
         self.name = 'main'
         
-        # Initialize managers
-        self.data_manager = DataManager()
-        self.settings_manager = SettingsManager()
+        # Shared managers owned by the app
+        self.data_manager = data_manager
+        self.settings_manager = settings_manager
+        self.background_service = background_service
+        
+        # Unix time each card's data was last fetched or revalidated
+        self.updated_at = {}
+        self.card_titles = {}
+        
+        # Last rendered data, written to the cold start snapshot
+        self.weather_data = None
+        self.forecast = None
+        self.calendar_state = None
+        self._snapshot_event = None
         
         # Build UI
         self.build_ui()
         
-        # Start timers
-        Clock.schedule_interval(self.update_time, 1)
-        Clock.schedule_interval(self.update_data, 300)  # Every 5 minutes
+        # Wall-clock ticks; each display part redraws on its own boundary
+        self.show_seconds = self.settings_manager.get('show_seconds', True)
+        self.world_clock = WorldClock(parse_cities(
+            self.settings_manager.get('world_clocks', DEFAULT_WORLD_CLOCKS)))
+        self.ticks = TickService(Clock.schedule_once)
+        self.ticks.subscribe('second' if self.show_seconds else 'minute', self.update_time)
+        self.ticks.subscribe('minute', lambda now: self.update_world_clocks())
+        self.ticks.subscribe('minute', lambda now: self.update_staleness())
+        self.ticks.subscribe('day', self.update_date)
+        self.ticks.subscribe('day', lambda now: self.update_calendar())
+        
+        # Scheduler threads post card updates; one batch per frame applies them
+        self.updates = UpdateQueue(Clock.schedule_once, after_batch=self.snapshot_after_batch)
+        self.updates.register('weather', self.update_weather_display)
+        self.updates.register('forecast', self.update_forecast_display)
+        self.updates.register('news', self.add_news_items, merge=prepend)
+        self.updates.register('stocks', self.update_stocks_display)
+        self.updates.register('revalidated', self.mark_updated, merge=combine)
+        
+        # Data refreshes come from the background service's scheduler
+        self.background_service.subscribe('weather', self.on_weather_data)
+        self.background_service.subscribe('forecast', self.on_forecast_data)
+        self.background_service.subscribe('news', self.on_news_data)
+        self.background_service.subscribe('stocks', self.on_stocks_data)
+        self.background_service.watch(self.on_revalidated)
         
         # Load initial data
         self.load_initial_data()
+        self.ticks.start()
     
     def build_ui(self):
         """Build the complete user interface"""
@@ -119,6 +127,7 @@ class MainScreen(MDScreen):
             left_action_items=[["menu", lambda x: self.open_nav_drawer()]],
             right_action_items=[
                 ["cog", lambda x: self.open_settings()],
+                ["stethoscope", lambda x: self.open_diagnostics()],
                 ["refresh", lambda x: self.refresh_all_data()],
                 ["fullscreen", lambda x: self.toggle_fullscreen()]
             ]
@@ -211,6 +220,7 @@ class MainScreen(MDScreen):
         title = MDLabel(text="🌤️ Säätiedot", font_size="18dp",
                        theme_text_color="Primary", halign="center", bold=True)
         layout.add_widget(title)
+        self.card_titles['weather'] = (card, title, title.text)
         
         # Weather content
         weather_layout = MDBoxLayout(orientation='horizontal', spacing=20,
@@ -244,6 +254,12 @@ class MainScreen(MDScreen):
         weather_layout.add_widget(details_layout)
         
         layout.add_widget(weather_layout)
+        
+        # Other configured cities on one line
+        self.other_cities_label = MDLabel(text="", font_size="12dp", size_hint_y=None,
+                                          height=20, theme_text_color="Secondary",
+                                          halign="center")
+        layout.add_widget(self.other_cities_label)
         card.add_widget(layout)
         
         return card
@@ -259,8 +275,14 @@ class MainScreen(MDScreen):
                        theme_text_color="Primary", halign="center", bold=True)
         layout.add_widget(title)
         
-        self.clocks_layout = MDBoxLayout(orientation='vertical', spacing=3)
-        layout.add_widget(self.clocks_layout)
+        # Scrollable, the list of cities is configurable
+        scroll = MDScrollView()
+        self.clocks_layout = MDBoxLayout(orientation='vertical', spacing=3,
+                                       adaptive_height=True)
+        self.clock_rows = RowPool(self.clocks_layout, self.create_clock_row,
+                                  self.update_clock_row)
+        scroll.add_widget(self.clocks_layout)
+        layout.add_widget(scroll)
         
         card.add_widget(layout)
         return card
@@ -277,6 +299,8 @@ class MainScreen(MDScreen):
         layout.add_widget(self.week_title)
         
         self.calendar_layout = MDBoxLayout(orientation='vertical', spacing=2)
+        self.calendar_rows = RowPool(self.calendar_layout, self.create_day_row,
+                                     self.update_day_row)
         layout.add_widget(self.calendar_layout)
         
         card.add_widget(layout)
@@ -293,13 +317,36 @@ class MainScreen(MDScreen):
                        theme_text_color="Primary", halign="center", bold=True)
         layout.add_widget(title)
         
-        # Forecast grid
+        # Forecast grid, one column per day
         self.forecast_layout = MDBoxLayout(orientation='horizontal', spacing=8)
+        self.forecast_rows = RowPool(self.forecast_layout, self.create_forecast_row,
+                                     self.update_forecast_row)
         layout.add_widget(self.forecast_layout)
         
         card.add_widget(layout)
         return card
     
+    def create_forecast_row(self):
+        """Create one forecast day column"""
+        row = MDBoxLayout(orientation='vertical', spacing=4)
+        row.day_label = MDLabel(font_size="14dp", halign="center", bold=True,
+                                theme_text_color="Primary")
+        row.icon_label = MDLabel(font_size="30dp", halign="center")
+        row.high_label = MDLabel(font_size="16dp", halign="center",
+                                 theme_text_color="Custom", text_color=[1, 0.71, 0.56, 1])
+        row.low_label = MDLabel(font_size="14dp", halign="center",
+                                theme_text_color="Custom", text_color=[0.6, 0.87, 1, 1])
+        for label in (row.day_label, row.icon_label, row.high_label, row.low_label):
+            row.add_widget(label)
+        return row
+    
+    def update_forecast_row(self, row, value):
+        day_text, icon, high_text, low_text = value
+        assign(row.day_label, text=day_text)
+        assign(row.icon_label, text=icon)
+        assign(row.high_label, text=high_text)
+        assign(row.low_label, text=low_text)
+    
     def create_news_card(self):
         """Create news ticker card"""
         card = MDCard(size_hint_y=None, height=150, elevation=8,
@@ -311,11 +358,14 @@ class MainScreen(MDScreen):
                        theme_text_color="Custom", text_color=[0, 0, 0, 1],
                        halign="center", bold=True)
         layout.add_widget(title)
+        self.card_titles['news'] = (card, title, title.text)
         
         # Scrollable news
         scroll = MDScrollView()
         self.news_layout = MDBoxLayout(orientation='vertical', spacing=3,
                                      adaptive_height=True)
+        self.news_rows = RowPool(self.news_layout, self.create_news_row,
+                                 self.update_news_row)
         scroll.add_widget(self.news_layout)
         layout.add_widget(scroll)
         
@@ -332,224 +382,329 @@ class MainScreen(MDScreen):
         title = MDLabel(text="📈 Pörssikurssit", font_size="18dp",
                        theme_text_color="Primary", halign="center", bold=True)
         layout.add_widget(title)
+        self.card_titles['stocks'] = (card, title, title.text)
         
         # Scrollable stocks
         scroll = MDScrollView()
         self.stocks_layout = MDBoxLayout(orientation='vertical', spacing=3,
                                        adaptive_height=True)
+        self.stock_rows = RowPool(self.stocks_layout, self.create_stock_row,
+                                  self.update_stock_row)
         scroll.add_widget(self.stocks_layout)
         layout.add_widget(scroll)
         
         card.add_widget(layout)
         return card
     
-    def update_time(self, dt):
-        """Update time display every second"""
-        now = datetime.now()
-        self.time_label.text = now.strftime("%H:%M:%S")
-        
-        # Update date once per minute
-        if now.second == 0:
-            day_name = WEEKDAY_NAMES_FI[now.strftime('%A')]
-            self.date_label.text = f"{day_name} {now.strftime('%d.%m.%Y')}"
-            self.update_world_clocks()
-            self.update_calendar()
+    def update_time(self, now):
+        """Update time display every second, or every minute without seconds"""
+        if self.show_seconds:
+            self.time_label.text = f"{now.hour:02d}:{now.minute:02d}:{now.second:02d}"
+        else:
+            self.time_label.text = f"{now.hour:02d}:{now.minute:02d}"
     
-    def update_data(self, dt):
-        """Update all data periodically"""
-        threading.Thread(target=self._background_update, daemon=True).start()
+    def update_date(self, now):
+        """Update date display at midnight"""
+        day_name = WEEKDAY_NAMES_FI[now.strftime('%A')]
+        self.date_label.text = f"{day_name} {now.strftime('%d.%m.%Y')}"
     
-    def _background_update(self):
-        """Background data update"""
-        try:
-            # Update weather
-            api_key = self.settings_manager.get('api_key')
-            city = self.settings_manager.get('default_city', 'Helsinki')
-            
-            if api_key:
-                weather_data = self.data_manager.fetch_weather_online(city, api_key)
-                if weather_data:
-                    Clock.schedule_once(lambda dt: self.update_weather_display(weather_data), 0)
-            
-            # Update other data sources
-            self.update_news_data()
-            self.update_stocks_data()
-            
-        except Exception as e:
-            print(f"Background update error: {e}")
+    def on_weather_data(self, weather_data):
+        """Called from the scheduler thread with fresh weather"""
+        self.updates.post('weather', weather_data)
+    
+    def on_forecast_data(self, forecast):
+        """Called from the scheduler thread with the default city's forecast"""
+        self.updates.post('forecast', forecast)
+    
+    def on_news_data(self, new_items):
+        """Called from the scheduler thread with news items not seen before"""
+        self.updates.post('news', list(new_items))
+    
+    def on_stocks_data(self, stocks_data):
+        """Called from the scheduler thread with fresh stocks"""
+        self.updates.post('stocks', stocks_data)
+    
+    def on_revalidated(self, source, ok):
+        """Called from the scheduler thread after every fetch attempt"""
+        if ok:
+            self.updates.post('revalidated', {source: time.time()})
+    
+    def mark_updated(self, updated_at):
+        """Record revalidation times ({source: Unix time}) and redo staleness once"""
+        self.updated_at.update(updated_at)
+        self.update_staleness()
+    
+    def update_staleness(self):
+        """Dim cards whose data is past the stale limit and show its age"""
+        now = time.time()
+        for source, (card, title, text) in self.card_titles.items():
+            updated_at = self.updated_at.get(source)
+            if updated_at is not None and self.background_service.is_stale(source, updated_at, now):
+                assign(title, text=f"{text} · {format_age(now - updated_at)}")
+                assign(card, opacity=0.6)
+            else:
+                assign(title, text=text)
+                assign(card, opacity=1)
     
     def update_weather_display(self, weather_data):
-        """Update weather UI elements"""
+        """Update weather UI elements; weather_data lists cities, default city first"""
         if weather_data:
-            self.temp_label.text = f"{weather_data['temperature']:.1f}°C"
-            self.weather_desc.text = weather_data['description']
-            self.weather_icon.text = weather_data['icon']
-            self.weather_city.text = weather_data['city']
+            self.weather_data = weather_data
+            primary = weather_data[0]
+            self.temp_label.text = f"{primary['temperature']:.1f}°C"
+            self.weather_desc.text = primary['description']
+            self.weather_icon.text = primary['icon']
+            self.weather_city.text = primary['city']
+            assign(self.other_cities_label, text="  ·  ".join(
+                f"{item['icon']} {item['city']} {item['temperature']:.0f}°"
+                for item in weather_data[1:]))
+    
+    def update_forecast_display(self, forecast):
+        """Render forecast days straight from the forecast's arrays"""
+        self.forecast = forecast
+        today = datetime.now().date()
+        values = []
+        for i in range(min(len(forecast), self.FORECAST_DAYS)):
+            day, low, high, icon_code = forecast.day(i)
+            if day < today:
+                continue
+            if day == today:
+                day_text = "Tänään"
+            else:
+                day_text = f"{WEEKDAYS_FI[day.weekday()]} {day.day}.{day.month}."
+            values.append((day_text, WEATHER_ICONS.get(icon_code, "☀️"),
+                           f"{high:.0f}°", f"{low:.0f}°"))
+        self.forecast_rows.update(values)
+    
+    def create_clock_row(self):
+        """Create one world clock row"""
+        row = MDBoxLayout(orientation='horizontal', size_hint_y=None, height=25)
+        row.city_label = MDLabel(size_hint_x=0.6, font_size="12dp",
+                                 theme_text_color="Secondary")
+        row.time_label = MDLabel(size_hint_x=0.4, font_size="12dp",
+                                 theme_text_color="Custom", text_color=[0.6, 0.87, 1, 1],
+                                 halign="right")
+        row.add_widget(row.city_label)
+        row.add_widget(row.time_label)
+        return row
+    
+    def update_clock_row(self, row, value):
+        name, time_text = value
+        assign(row.city_label, text=name)
+        assign(row.time_label, text=time_text)
     
     def update_world_clocks(self):
         """Update world clock displays"""
-        self.clocks_layout.clear_widgets()
-        
-        cities = [
-            ("UTC", None),
-            ("Tokyo", "Asia/Tokyo"),
-            ("London", "Europe/London"),
-            ("New York", "America/New_York")
-        ]
-        
-        for name, tz in cities:
-            try:
-                if tz is None:
-                    now = datetime.now(timezone.utc)
-                else:
-                    now = datetime.now(zoneinfo.ZoneInfo(tz))
-                
-                clock_layout = MDBoxLayout(orientation='horizontal', size_hint_y=None, height=25)
-                
-                city_label = MDLabel(text=name, size_hint_x=0.6, font_size="12dp",
-                                   theme_text_color="Secondary")
-                time_label = MDLabel(text=now.strftime('%H:%M'), size_hint_x=0.4, font_size="12dp",
-                                   theme_text_color="Custom", text_color=[0.6, 0.87, 1, 1],
-                                   halign="right")
-                
-                clock_layout.add_widget(city_label)
-                clock_layout.add_widget(time_label)
-                self.clocks_layout.add_widget(clock_layout)
-                
-            except Exception as e:
-                print(f"Clock error for {name}: {e}")
+        self.clock_rows.update(self.world_clock.times())
+    
+    def create_day_row(self):
+        """Create one week calendar row"""
+        row = MDBoxLayout(orientation='vertical', size_hint_y=None, height=35, spacing=1)
+        row.day_label = MDLabel(font_size="11dp", size_hint_y=None, height=20,
+                                theme_text_color="Custom")
+        row.info_label = MDLabel(font_size="9dp", size_hint_y=None, height=0,
+                                 theme_text_color="Custom", text_color=[0.8, 0.8, 0.8, 1])
+        row.add_widget(row.day_label)
+        row.add_widget(row.info_label)
+        return row
+    
+    def update_day_row(self, row, value):
+        day_text, text_color, info = value
+        assign(row, height=45 if info else 35)
+        assign(row.day_label, text=day_text, text_color=text_color)
+        assign(row.info_label, text=info, height=15 if info else 0)
     
     def update_calendar(self):
-        """Update week calendar"""
-        self.calendar_layout.clear_widgets()
-        
+        """Update week calendar; nothing to do if it already shows today's week"""
         today = datetime.now().date()
+        if self.calendar_state and self.calendar_state['date'] == today.isoformat():
+            return
         monday = today - timedelta(days=today.weekday())
         week_num = monday.isocalendar()[1]
         
-        self.week_title.text = f"📅 Viikko {week_num}"
+        assign(self.week_title, text=f"📅 Viikko {week_num}")
         
-        for i in range(7):
-            date = monday + timedelta(days=i)
-            is_today = date == today
-            is_weekend = date.weekday() >= 5
-            
-            # Get name day
-            name_day = FINNISH_NAME_DAYS.get((date.month, date.day), "")
-            holiday = FINNISH_HOLIDAYS.get((date.month, date.day), "")
-            info = holiday or name_day
-            
-            # Create day layout
-            day_layout = MDBoxLayout(orientation='vertical', size_hint_y=None, 
-                                   height=35 if not info else 45, spacing=1)
+        values = []
+        for i, day in enumerate(self.data_manager.calendar.week(today)):
+            is_today = day.date == today
+            info = day.holiday or day.name_days
             
             # Day name and number
-            day_text = f"{WEEKDAYS_FI[i]} {date.day}"
+            day_text = f"{WEEKDAYS_FI[i]} {day.date.day}"
             
             # Color coding
             if is_today:
                 text_color = [0.69, 1, 0.62, 1]  # Green
-            elif holiday:
+            elif day.holiday:
                 text_color = [1, 0.42, 0.42, 1]  # Red
-            elif is_weekend:
+            elif day.flags & WEEKEND:
                 text_color = [0.42, 0.42, 1, 1]  # Blue
             else:
                 text_color = [1, 1, 1, 1]  # White
             
-            day_label = MDLabel(text=day_text, font_size="11dp", size_hint_y=None, height=20,
-                              theme_text_color="Custom", text_color=text_color)
-            day_layout.add_widget(day_label)
-            
-            # Info text
-            if info:
-                info_label = MDLabel(text=info[:20] + ("..." if len(info) > 20 else ""),
-                                   font_size="9dp", size_hint_y=None, height=15,
-                                   theme_text_color="Custom", text_color=[0.8, 0.8, 0.8, 1])
-                day_layout.add_widget(info_label)
-            
-            self.calendar_layout.add_widget(day_layout)
+            info_text = info[:20] + ("..." if len(info) > 20 else "")
+            values.append((day_text, text_color, info_text))
+        
+        self.calendar_rows.update(values)
+        self.calendar_state = {'date': today.isoformat(), 'title': self.week_title.text,
+                               'rows': values}
     
-    def update_news_data(self):
-        """Update news in background"""
-        try:
-            news_data = self.data_manager.fetch_news()
-            if news_data:
-                Clock.schedule_once(lambda dt: self.update_news_display(news_data), 0)
-        except Exception as e:
-            print(f"News update error: {e}")
+    def create_news_row(self):
+        """Create one headline row"""
+        return MDLabel(
+            theme_text_color="Custom",
+            text_color=[0, 0, 0, 1],
+            size_hint_y=None,
+            height=25,
+            font_size="11dp"
+        )
+    
+    def update_news_row(self, row, item):
+        assign(row, text=f"[{item['source']}] {item['title'][:80]}...")
     
     def update_news_display(self, news_data):
         """Update news UI"""
-        self.news_layout.clear_widgets()
-        for item in news_data[:5]:
-            news_text = f"[{item['source']}] {item['title'][:80]}..."
-            label = MDLabel(
-                text=news_text,
-                theme_text_color="Custom",
-                text_color=[0, 0, 0, 1],
-                size_hint_y=None,
-                height=25,
-                font_size="11dp"
-            )
-            self.news_layout.add_widget(label)
-    
-    def update_stocks_data(self):
-        """Update stocks in background"""
-        try:
-            stocks_data = self.data_manager.fetch_stocks()
-            if stocks_data:
-                Clock.schedule_once(lambda dt: self.update_stocks_display(stocks_data), 0)
-        except Exception as e:
-            print(f"Stocks update error: {e}")
+        self.news_rows.update(news_data[:self.NEWS_ROWS])
+    
+    def add_news_items(self, new_items):
+        """Prepend new headlines; existing rows are reused"""
+        self.update_news_display(new_items + self.news_rows.values)
+    
+    def create_stock_row(self):
+        """Create one stock row"""
+        return MDLabel(
+            theme_text_color="Custom",
+            size_hint_y=None,
+            height=20,
+            font_size="11dp"
+        )
+    
+    def update_stock_row(self, row, item):
+        change_color = [0.56, 0.93, 0.56, 1] if item['change'] >= 0 else [1, 0.71, 0.76, 1]
+        arrow = "↗" if item['change'] >= 0 else "↘"
+        
+        stock_text = f"{item['name']} {item['price']:.2f} {arrow}{item['change']:+.2f}%"
+        assign(row, text=stock_text, text_color=change_color)
     
     def update_stocks_display(self, stocks_data):
         """Update stocks UI"""
-        self.stocks_layout.clear_widgets()
-        for item in stocks_data[:6]:
-            change_color = [0.56, 0.93, 0.56, 1] if item['change'] >= 0 else [1, 0.71, 0.76, 1]
-            arrow = "↗" if item['change'] >= 0 else "↘"
-            
-            stock_text = f"{item['name']} {item['price']:.2f} {arrow}{item['change']:+.2f}%"
-            label = MDLabel(
-                text=stock_text,
-                theme_text_color="Custom",
-                text_color=change_color,
-                size_hint_y=None,
-                height=20,
-                font_size="11dp"
-            )
-            self.stocks_layout.add_widget(label)
+        self.stock_rows.update(stocks_data[:6])
+    
+    def snapshot_state(self):
+        """Everything the cards last rendered, for the cold start snapshot"""
+        forecast = self.forecast
+        return {
+            'cities': self.background_service.weather_cities(),
+            'weather': self.weather_data,
+            'forecast': forecast and {'city': forecast.city, 'days': forecast.days,
+                                      'low': forecast.low, 'high': forecast.high,
+                                      'icons': forecast.icons},
+            'news': self.news_rows.values,
+            'stocks': self.stock_rows.values,
+            'updated_at': self.updated_at,
+            'calendar': self.calendar_state
+        }
+    
+    def save_snapshot(self, *args):
+        """Write the cold start snapshot; after update batches, on pause and on stop"""
+        self._snapshot_event = None
+        self.data_manager.snapshot.write(self.snapshot_state())
+    
+    def snapshot_after_batch(self):
+        """Write the snapshot after an update batch, at most every SNAPSHOT_INTERVAL s
+        
+        A kiosk's usual cold start follows a kill or power loss, so the
+        snapshot is kept current instead of relying on pause and stop. A
+        batch inside the interval defers one write to its end instead of
+        being dropped, so the snapshot never stays older than the cache.
+        """
+        if self._snapshot_event is not None:
+            return
+        written_at = self.data_manager.snapshot.written_at
+        wait = 0 if written_at is None else written_at + self.SNAPSHOT_INTERVAL - time.time()
+        if wait <= 0:
+            self.save_snapshot()
+        else:
+            self._snapshot_event = Clock.schedule_once(self.save_snapshot, wait)
+    
+    def render_snapshot(self, state):
+        """Fill every card from a snapshot; False if it was taken for other cities"""
+        if state.get('cities') != self.background_service.weather_cities():
+            return False
+        if state.get('forecast'):
+            self.update_forecast_display(Forecast(**state['forecast']))
+        if state.get('weather'):
+            self.update_weather_display(state['weather'])
+        self.update_news_display(state.get('news') or [])
+        self.update_stocks_display(state.get('stocks') or [])
+        self.updated_at.update(state.get('updated_at') or {})
+        self.update_staleness()
+        
+        calendar = state.get('calendar')
+        if calendar and calendar['date'] == datetime.now().date().isoformat():
+            assign(self.week_title, text=calendar['title'])
+            self.calendar_rows.update(calendar['rows'])
+            self.calendar_state = calendar
+        else:
+            self.update_calendar()
+        self.update_world_clocks()
+        return True
     
     def load_initial_data(self):
-        """Load cached data on startup"""
-        # Load offline data first
-        weather = self.data_manager.load_from_db('weather')
+        """Load what was last rendered on startup
+        
+        A cold start reads one snapshot file; if it is missing, unusable or
+        older than the newest cache write (e.g. the headless engine fetched
+        meanwhile), the cards are filled from the data cache and a new
+        snapshot is written.
+        """
+        snapshot = self.data_manager.snapshot
+        state = snapshot.read()
+        if (state and snapshot.written_at >= self.data_manager.last_fetched_at()
+                and self.render_snapshot(state)):
+            return
+        
+        # Show cached data at once with its age; the scheduler revalidates it
+        cities = self.background_service.weather_cities()
+        weather = self.data_manager.load_weather(cities)
+        forecast = self.data_manager.load_forecast(cities[0])
+        if forecast:
+            self.update_forecast_display(forecast)
         if weather:
-            self.update_weather_display(weather)
+            self.update_weather_display([entry['data'] for entry in weather])
+            self.updated_at['weather'] = min(entry['fetched_at'] for entry in weather)
         
-        news = self.data_manager.load_from_db('news')
-        if news:
-            self.update_news_display(news)
-        
-        stocks = self.data_manager.load_from_db('stocks')
-        if stocks:
-            self.update_stocks_display(stocks)
+        displays = {
+            'news': self.update_news_display,
+            'stocks': self.update_stocks_display
+        }
+        for source, display in displays.items():
+            entry = self.data_manager.load_entry(source)
+            if entry and entry['data']:
+                display(entry['data'])
+                self.updated_at[source] = entry['fetched_at']
+        self.update_staleness()
         
         # Update clocks and calendar immediately
         self.update_world_clocks()
         self.update_calendar()
+        self.save_snapshot()
     
     def open_settings(self):
         """Open settings dialog"""
         SettingsDialog(self).open()
     
+    def open_diagnostics(self):
+        """Open connection diagnostics"""
+        DiagnosticsDialog(self).open()
+    
     def open_nav_drawer(self):
         """Open navigation drawer (future feature)"""
         pass
     
     def refresh_all_data(self):
         """Manual refresh of all data"""
-        self.update_data(None)
+        self.background_service.refresh_all()
     
     def toggle_fullscreen(self):
         """Toggle fullscreen mode"""
@@ -566,7 +721,12 @@ class SettingsDialog:
     
     def open(self):
         """Open settings dialog"""
-        content = MDBoxLayout(orientation='vertical', spacing=15, size_hint_y=None, height=400)
+        from kivymd.uix.button import MDRaisedButton
+        from kivymd.uix.dialog import MDDialog
+        from kivymd.uix.selectioncontrol import MDSwitch
+        from kivymd.uix.textfield import MDTextField
+        
+        content = MDBoxLayout(orientation='vertical', spacing=15, size_hint_y=None, height=480)
         
         # API Key
         api_label = MDLabel(text="OpenWeatherMap API-avain:", size_hint_y=None, height=30)
@@ -588,6 +748,13 @@ class SettingsDialog:
         content.add_widget(city_label)
         content.add_widget(self.city_field)
         
+        # Extra weather cities
+        self.cities_field = MDTextField(
+            text=self.settings_manager.get('weather_cities', ''),
+            helper_text="Muut kaupungit pilkuilla erotettuna, esim: Turku, Oulu"
+        )
+        content.add_widget(self.cities_field)
+        
         # Notifications
         notif_label = MDLabel(text="Ilmoitukset:", size_hint_y=None, height=30)
         content.add_widget(notif_label)
@@ -630,6 +797,7 @@ class SettingsDialog:
         """Save settings"""
         self.settings_manager.set('api_key', self.api_field.text)
         self.settings_manager.set('default_city', self.city_field.text)
+        self.settings_manager.set('weather_cities', self.cities_field.text)
         self.settings_manager.set('weather_alerts', self.weather_switch.active)
         self.settings_manager.set('nameday_notifications', self.nameday_switch.active)
         self.settings_manager.set('holiday_notifications', self.holiday_switch.active)
@@ -644,9 +812,67 @@ class SettingsDialog:
         if self.dialog:
             self.dialog.dismiss()
 
+class DiagnosticsDialog:
+    """Circuit breaker state of every data source and host"""
+    
+    def __init__(self, parent):
+        self.parent = parent
+        self.dialog = None
+    
+    @staticmethod
+    def describe(name, state):
+        """One line of breaker state, e.g. 'news: Katkaistu, 3 virhettä, uusi yritys 120 s'"""
+        text = f"{name}: {BREAKER_STATES_FI.get(state['state'], state['state'])}"
+        if state['failures']:
+            text += f", {state['failures']} virhettä"
+        if state['retry_in']:
+            text += f", uusi yritys {state['retry_in']:.0f} s"
+        if state['last_error']:
+            text += f"\n  {state['last_error'][:80]}"
+        return text
+    
+    def open(self):
+        """Open diagnostics dialog"""
+        from kivymd.uix.button import MDRaisedButton
+        from kivymd.uix.dialog import MDDialog
+        
+        diagnostics = self.parent.background_service.diagnostics()
+        lines = ["Verkko: " + ("yhteys" if diagnostics['network']['up'] else "ei yhteyttä"),
+                 "", "Lähteet:"]
+        lines += [self.describe(name, state) for name, state in diagnostics['sources'].items()]
+        lines += ["", "Palvelimet:"]
+        lines += [self.describe(host, state) for host, state in diagnostics['hosts'].items()]
+        lines += ["", "Työjonot:"]
+        lines += [f"{name}: {stats['queued']} jonossa, {stats['running']} käynnissä, "
+                  f"{stats['merged']} yhdistetty"
+                  for name, stats in diagnostics['workers'].items()]
+        updates = self.parent.updates.stats()
+        if updates['presented_p95_ms'] is not None:
+            lines += [f"UI: {updates['batches']} päivitystä, {updates['merged']} yhdistetty, "
+                      f"kuvaan p50 {updates['presented_p50_ms']:.0f} ms, "
+                      f"p95 {updates['presented_p95_ms']:.0f} ms"]
+        
+        content = MDLabel(text="\n".join(lines), size_hint_y=None, height=400,
+                          font_style="Caption")
+        self.dialog = MDDialog(
+            title="Yhteydet",
+            type="custom",
+            content_cls=content,
+            buttons=[MDRaisedButton(text="SULJE", on_release=self.close)]
+        )
+        self.dialog.open()
+    
+    def close(self, *args):
+        """Close dialog"""
+        if self.dialog:
+            self.dialog.dismiss()
+
 class InfonayttoApp(MDApp):
     """Main application class"""
     
+    # Seconds on_stop waits for fetches already running
+    STOP_TIMEOUT = 2
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.title = "Infonäyttö Pro"
@@ -659,6 +885,7 @@ class InfonayttoApp(MDApp):
         self.data_manager = None
         self.background_service = None
         self.notification_manager = None
+        self.main_screen = None
     
     def build(self):
         """Build the app"""
@@ -666,16 +893,18 @@ class InfonayttoApp(MDApp):
         if platform == 'android':
             self.request_android_permissions()
         
-        # Initialize managers
+        # Initialize managers (shared by every screen and service)
         self.settings_manager = SettingsManager()
         self.data_manager = DataManager()
+        self.background_service = BackgroundService(self.data_manager, self.settings_manager)
         
         # Create screen manager
         sm = MDScreenManager()
         
         # Add main screen
-        main_screen = MainScreen()
-        sm.add_widget(main_screen)
+        self.main_screen = MainScreen(self.data_manager, self.settings_manager,
+                                      self.background_service)
+        sm.add_widget(self.main_screen)
         
         return sm
     
@@ -683,11 +912,30 @@ class InfonayttoApp(MDApp):
         """Called when app starts"""
         print("Infonäyttö Pro starting...")
         
+        if self.settings_manager.get('staged_startup', True):
+            # Paint the clock and cached cards first; the rest waits for the first frame
+            from kivy.core.window import Window
+            Window.bind(on_flip=self.on_first_frame)
+        else:
+            self.start_deferred()
+    
+    def on_first_frame(self, *args):
+        """Second startup stage, once the first frame is on screen"""
+        from kivy.core.window import Window
+        Window.unbind(on_flip=self.on_first_frame)
+        Clock.schedule_once(lambda dt: self.start_deferred(), 0)
+    
+    def start_deferred(self):
+        """Android features and background refreshes"""
+        # UI update latency is measured up to the frame that shows it
+        from kivy.core.window import Window
+        Window.bind(on_flip=self.main_screen.updates.frame_presented)
+        
         if platform == 'android':
             # Initialize Android-specific features
             self.setup_android_features()
         
-        # Start background services
+        # Start background services; their first fetches import the network libraries
         self.start_background_services()
         
         print("Infonäyttö Pro started successfully!")
@@ -727,17 +975,15 @@ class InfonayttoApp(MDApp):
     def start_background_services(self):
         """Start background data and notification services"""
         try:
-            # Start background service
-            self.background_service = BackgroundService(self.data_manager, self.settings_manager)
+            # Start background refreshes
+            self.background_service.start()
             
             # Start notification manager
             self.notification_manager = NotificationManager(self.data_manager, self.settings_manager)
             
-            # Schedule daily notification checks
-            Clock.schedule_interval(
-                lambda dt: self.notification_manager.check_daily_notifications(), 
-                60  # Check every minute
-            )
+            # Check daily notifications on every wall-clock minute
+            self.main_screen.ticks.subscribe('minute',
+                                             self.notification_manager.check_daily_notifications)
             
             print("Background services started")
         except Exception as e:
@@ -746,6 +992,8 @@ class InfonayttoApp(MDApp):
     def on_pause(self):
         """Called when app is paused"""
         print("App paused - background services continue")
+        if self.main_screen:
+            self.main_screen.save_snapshot()
         return True
     
     def on_resume(self):
@@ -755,15 +1003,20 @@ class InfonayttoApp(MDApp):
         if platform == 'android':
             try:
                 ClockWidget.update_widget()
-                WeatherWidget.update_widget(self.data_manager)
+                WeatherWidget.update_widget(self.data_manager,
+                                            self.background_service.weather_cities()[0])
             except Exception as e:
                 print(f"Widget update error: {e}")
     
     def on_stop(self):
         """Called when app stops"""
         print("App stopping...")
+        if self.main_screen:
+            self.main_screen.save_snapshot()
         if self.background_service:
-            self.background_service.stop()
+            self.background_service.stop(self.STOP_TIMEOUT)
+        if self.data_manager:
+            self.data_manager.close(self.STOP_TIMEOUT)
 
 # Entry point
 if __name__ == '__main__':
@@ -0,0 +1,209 @@
+"""
+Market Calendar
+Exchange trading sessions, time zones and holidays as sorted interval arrays
+"""
+
+import bisect
+import threading
+import time
+import zoneinfo
+from array import array
+from datetime import date, datetime, time as dtime, timedelta
+
+from finnish_calendar import easter_sunday, midsummer_eve
+
+def nth_weekday(year, month, weekday, n):
+    """n:th given weekday of a month (n=-1 for the last one)"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def us_observed(day):
+    """US rule: Saturday holidays move to Friday, Sunday ones to Monday"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+def helsinki_holidays(year):
+    """Nasdaq Helsinki market holidays"""
+    easter = easter_sunday(year)
+    return {
+        date(year, 1, 1), date(year, 1, 6),
+        easter - timedelta(days=2), easter + timedelta(days=1),
+        date(year, 5, 1), easter + timedelta(days=39),
+        midsummer_eve(year), date(year, 12, 6),
+        date(year, 12, 24), date(year, 12, 25), date(year, 12, 26), date(year, 12, 31)
+    }
+
+def stockholm_holidays(year):
+    """Nasdaq Stockholm market holidays"""
+    easter = easter_sunday(year)
+    return {
+        date(year, 1, 1), date(year, 1, 6),
+        easter - timedelta(days=2), easter + timedelta(days=1),
+        date(year, 5, 1), easter + timedelta(days=39), date(year, 6, 6),
+        midsummer_eve(year),
+        date(year, 12, 24), date(year, 12, 25), date(year, 12, 26), date(year, 12, 31)
+    }
+
+def nyse_holidays(year):
+    """NYSE market holidays"""
+    holidays = {
+        nth_weekday(year, 1, 0, 3),           # Martin Luther King Jr. Day
+        nth_weekday(year, 2, 0, 3),           # Washington's Birthday
+        easter_sunday(year) - timedelta(days=2),
+        nth_weekday(year, 5, 0, -1),          # Memorial Day
+        us_observed(date(year, 7, 4)),
+        nth_weekday(year, 9, 0, 1),           # Labor Day
+        nth_weekday(year, 11, 3, 4),          # Thanksgiving
+        us_observed(date(year, 12, 25))
+    }
+    # New Year's Day on a Saturday is not observed on the Friday before
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(us_observed(new_year))
+    if year >= 2022:
+        holidays.add(us_observed(date(year, 6, 19)))  # Juneteenth
+    return holidays
+
+class Exchange:
+    """Regular trading session of one exchange"""
+
+    def __init__(self, code, tz, open_time, close_time, holidays):
+        self.code = code
+        self.tz = zoneinfo.ZoneInfo(tz)
+        self.open_time = open_time
+        self.close_time = close_time
+        self.holidays = holidays
+
+    def sessions(self, year):
+        """(open, close) Unix timestamps for every trading day of year"""
+        closed = self.holidays(year)
+        day = date(year, 1, 1)
+        end = date(year + 1, 1, 1)
+        while day < end:
+            if day.weekday() < 5 and day not in closed:
+                opens = datetime.combine(day, self.open_time, tzinfo=self.tz).timestamp()
+                closes = datetime.combine(day, self.close_time, tzinfo=self.tz).timestamp()
+                yield opens, closes
+            day += timedelta(days=1)
+
+EXCHANGES = {
+    'XHEL': Exchange('XHEL', 'Europe/Helsinki', dtime(10, 0), dtime(18, 30), helsinki_holidays),
+    'XSTO': Exchange('XSTO', 'Europe/Stockholm', dtime(9, 0), dtime(17, 30), stockholm_holidays),
+    'XNYS': Exchange('XNYS', 'America/New_York', dtime(9, 30), dtime(16, 0), nyse_holidays)
+}
+
+# Yahoo symbol suffix -> exchange; symbols without a suffix trade in the US
+SYMBOL_SUFFIXES = {
+    '.HE': 'XHEL',
+    '.ST': 'XSTO'
+}
+
+def exchange_for_symbol(symbol):
+    for suffix, code in SYMBOL_SUFFIXES.items():
+        if symbol.endswith(suffix):
+            return code
+    return 'XNYS'
+
+class MarketCalendar:
+    """Trading sessions as sorted open/close arrays; lookups are binary searches
+
+    Sessions are built per exchange one calendar year at a time, on first
+    use of that year.
+    """
+
+    def __init__(self, exchanges=None):
+        self.exchanges = exchanges or EXCHANGES
+        self._opens = {code: array('d') for code in self.exchanges}
+        self._closes = {code: array('d') for code in self.exchanges}
+        self._years = {code: set() for code in self.exchanges}
+        self._lock = threading.Lock()
+
+    def _ensure(self, code, t):
+        """Build sessions for the year of t and the years on either side"""
+        year = datetime.fromtimestamp(t, self.exchanges[code].tz).year
+        with self._lock:
+            missing = [y for y in (year - 1, year, year + 1) if y not in self._years[code]]
+            if not missing:
+                return
+            sessions = list(zip(self._opens[code], self._closes[code]))
+            for y in missing:
+                sessions.extend(self.exchanges[code].sessions(y))
+                self._years[code].add(y)
+            sessions.sort()
+            self._opens[code] = array('d', (s[0] for s in sessions))
+            self._closes[code] = array('d', (s[1] for s in sessions))
+
+    def _session_index(self, code, t):
+        """Index of the last session opening at or before t"""
+        self._ensure(code, t)
+        return bisect.bisect_right(self._opens[code], t) - 1
+
+    def is_open(self, code, t=None):
+        t = time.time() if t is None else t
+        i = self._session_index(code, t)
+        return i >= 0 and t < self._closes[code][i]
+
+    def next_open(self, code, t=None):
+        """Start of the next session; t itself if the exchange is open"""
+        t = time.time() if t is None else t
+        if self.is_open(code, t):
+            return t
+        i = self._session_index(code, t) + 1
+        return self._opens[code][i]
+
+    def next_close(self, code, t=None):
+        """End of the current session, or of the next one if closed"""
+        t = time.time() if t is None else t
+        i = self._session_index(code, t)
+        if i >= 0 and t < self._closes[code][i]:
+            return self._closes[code][i]
+        return self._closes[code][i + 1]
+
+    def last_close(self, code, t=None):
+        """End of the most recent session that closed at or before t"""
+        t = time.time() if t is None else t
+        i = self._session_index(code, t)
+        if i >= 0 and t >= self._closes[code][i]:
+            return self._closes[code][i]
+        return self._closes[code][i - 1] if i >= 1 else 0.0
+
+class MarketHours:
+    """Combined trading hours of the exchanges behind a set of symbols"""
+
+    CLOSE_SETTLE = 300  # Wait after a close before fetching final prices, seconds
+
+    def __init__(self, symbols, calendar=None):
+        self.calendar = calendar or MarketCalendar()
+        self.codes = sorted({exchange_for_symbol(symbol) for symbol in symbols})
+
+    def is_open(self, t=None):
+        t = time.time() if t is None else t
+        return any(self.calendar.is_open(code, t) for code in self.codes)
+
+    def next_open(self, t=None):
+        t = time.time() if t is None else t
+        return min(self.calendar.next_open(code, t) for code in self.codes)
+
+    def last_close(self, t=None):
+        t = time.time() if t is None else t
+        return max(self.calendar.last_close(code, t) for code in self.codes)
+
+    def refresh_delay(self, interval, t=None):
+        """Seconds until quotes should next be fetched
+
+        Polls every interval while any exchange is open, once more shortly
+        after each close for final prices, then sleeps until the next open.
+        """
+        t = time.time() if t is None else t
+        open_codes = [code for code in self.codes if self.calendar.is_open(code, t)]
+        if not open_codes:
+            return self.next_open(t) - t
+
+        first_close = min(self.calendar.next_close(code, t) for code in open_codes)
+        return min(interval, first_close - t + self.CLOSE_SETTLE)
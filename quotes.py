@@ -0,0 +1,100 @@
+"""
+Stock Quotes
+Concurrent quote downloads and a market-hours aware quote cache
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+Quote = namedtuple('Quote', ['symbol', 'name', 'price', 'change'])
+
+_session = None
+_session_lock = threading.Lock()
+
+def _yahoo_session():
+    """HTTP session shared by every quote download, created on first use
+
+    Without one, yf.download opens a new session per call and so
+    reconnects and drops Yahoo's cookies on every refresh. Like yfinance,
+    this prefers a browser-impersonating curl_cffi session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            try:
+                from curl_cffi import requests as curl_requests
+                _session = curl_requests.Session(impersonate="chrome")
+            except ImportError:
+                import requests
+                _session = requests.Session()
+        return _session
+
+def download_quotes(symbols, timeout=10):
+    """Fetch recent closes of every symbol, one request per symbol, all at once
+
+    yfinance has no multi-symbol chart endpoint, so each symbol is its own
+    request; they run concurrently, one thread each, so a refresh takes
+    about one request's time (at most timeout seconds) instead of the sum.
+    symbols is a list of (symbol, name) pairs. Returns a list of Quote in
+    the same order, skipping symbols without two closing prices.
+    """
+    # Pulls in pandas and numpy; only paid by the first stock fetch
+    import yfinance as yf
+
+    tickers = [symbol for symbol, _ in symbols]
+    frame = yf.download(tickers, period='5d', group_by='ticker', progress=False,
+                        threads=len(tickers), timeout=timeout, session=_yahoo_session())
+
+    quotes = []
+    for symbol, name in symbols:
+        try:
+            closes = frame[symbol]['Close'].dropna()
+        except KeyError:
+            continue
+        if len(closes) < 2:
+            continue
+
+        price = float(closes.iloc[-1])
+        previous = float(closes.iloc[-2])
+        change = (price - previous) / previous * 100 if previous else 0.0
+        quotes.append(Quote(symbol, name, price, change))
+    return quotes
+
+class QuoteCache:
+    """Latest quotes, fresh for ttl seconds while a market is open
+
+    While every market is closed prices cannot move, so quotes fetched
+    after the last close stay fresh until the next open.
+    """
+
+    def __init__(self, ttl, market):
+        self.ttl = ttl
+        self.market = market
+        self._quotes = ()
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def is_fresh(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            if not self._quotes:
+                return False
+            fetched_at = self._fetched_at
+        if self.market.is_open(now):
+            return now - fetched_at < self.ttl
+        return fetched_at >= self.market.last_close(now)
+
+    def update(self, quotes, fetched_at=None):
+        """Replace cached quotes; fetched_at is a Unix timestamp"""
+        with self._lock:
+            self._quotes = tuple(quotes)
+            self._fetched_at = time.time() if fetched_at is None else fetched_at
+
+    def get(self):
+        with self._lock:
+            return list(self._quotes)
+
+    def as_dicts(self):
+        """Quotes as records for the UI and the data cache"""
+        return [quote._asdict() for quote in self.get()]
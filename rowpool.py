@@ -0,0 +1,48 @@
+"""
+Row Pool
+Reuses row widgets between UI updates and only touches changed properties
+"""
+
+def assign(widget, **props):
+    """Set widget properties that differ from the given values; returns True if any did"""
+    changed = False
+    for name, value in props.items():
+        if getattr(widget, name) != value:
+            setattr(widget, name, value)
+            changed = True
+    return changed
+
+class RowPool:
+    """Keeps one row widget per value in a layout and updates rows in place
+
+    create_row() builds a new row widget; update_row(row, value) applies a
+    value to it (typically through assign()). Rows are only added or
+    removed when the number of values changes.
+    """
+
+    def __init__(self, layout, create_row, update_row):
+        self.layout = layout
+        self.create_row = create_row
+        self.update_row = update_row
+        self.rows = []
+        self.values = []
+
+    def update(self, values):
+        values = list(values)
+
+        while len(self.rows) < len(values):
+            row = self.create_row()
+            self.layout.add_widget(row)
+            self.rows.append(row)
+        while len(self.rows) > len(values):
+            self.layout.remove_widget(self.rows.pop())
+
+        for i, value in enumerate(values):
+            if i < len(self.values) and self.values[i] == value:
+                continue
+            self.update_row(self.rows[i], value)
+
+        self.values = values
+
+    def clear(self):
+        self.update([])
@@ -0,0 +1,347 @@
+"""
+Refresh Scheduler
+Single owner of periodic data refreshes with subscriber fan-out
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+
+from breaker import CircuitBreaker
+from workers import WorkerPool
+
+# Returned by a fetch that found nothing due yet, e.g. when it ran early
+# within its jitter; reported to watchers with ok=None, not as a refresh
+NOT_DUE = object()
+
+class RefreshSource:
+    """One refreshable data source"""
+
+    def __init__(self, name, fetch, interval, breaker, condition=None, jitter=0.1, timeout=30,
+                 next_delay=None):
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.condition = condition
+        self.next_delay = next_delay
+        self.jitter = jitter
+        self.timeout = timeout
+        self.breaker = breaker  # Opens on failure; the retry delay is its reset delay
+        self.deadline = 0.0
+        self.in_flight = False
+        self.started = 0.0
+        self.generation = 0  # Bumped per run; late results of a timed-out run are dropped
+        self.future = None
+        self.running = False  # A worker is inside fetch(), possibly of a timed-out run
+
+    @property
+    def failures(self):
+        return self.breaker.failures
+
+class RefreshScheduler:
+    """Deadline-driven scheduler; sleeps until the next source is due
+
+    Deadlines come from a monotonic clock and live in a heap. Stale heap
+    entries are skipped lazily instead of being removed. Due sources are
+    fetched concurrently on a bounded worker pool and each publishes as
+    soon as it finishes; with max_workers=0 fetches run inline.
+
+    Each source has a circuit breaker that opens on the first failure.
+    While open the source sleeps with exponential backoff; the first run
+    after that is half-open and decides whether it closes again.
+    """
+
+    RETRY_BASE = 60      # First retry after a failure, seconds
+    MAX_BACKOFF = 3600   # Longest retry delay, seconds
+
+    def __init__(self, clock=time.monotonic, rng=None, max_workers=4):
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.sources = {}
+        self.subscribers = {}
+        self.watchers = []
+        self.running = False
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread = None
+        self.pool = WorkerPool("refresh", max_workers) if max_workers else None
+
+    def add_source(self, name, fetch, interval, condition=None, jitter=0.1, timeout=30,
+                   next_delay=None, first_delay=0):
+        """Register a source, due after first_delay seconds (default: now)
+
+        fetch() returns data, None or NOT_DUE and raises on failure.
+        interval and timeout are in seconds; jitter is the +/- fraction of
+        interval applied to every delay. A fetch still running after timeout
+        counts as failed and its result is discarded. next_delay(interval),
+        if given, returns the delay after a successful run, e.g. to sleep
+        until a market opens. A fetch is skipped while condition() is false.
+        """
+        with self._lock:
+            breaker = CircuitBreaker(name, threshold=1, reset_after=self.RETRY_BASE,
+                                     max_reset=max(self.MAX_BACKOFF, interval), jitter=jitter,
+                                     clock=self.clock, rng=self.rng)
+            source = RefreshSource(name, fetch, interval, breaker, condition, jitter, timeout,
+                                   next_delay)
+            self.sources[name] = source
+            self.subscribers.setdefault(name, [])
+            self._schedule(source, self.clock() + first_delay)
+
+    def subscribe(self, name, callback):
+        """Call callback(data) whenever source name produces new data"""
+        with self._lock:
+            self.subscribers.setdefault(name, []).append(callback)
+
+    def watch(self, callback):
+        """Call callback(name, ok) after every fetch that ran, with or without data
+
+        ok is None when the fetch returned NOT_DUE.
+        """
+        with self._lock:
+            self.watchers.append(callback)
+
+    def unsubscribe(self, name, callback):
+        with self._lock:
+            if callback in self.subscribers.get(name, []):
+                self.subscribers[name].remove(callback)
+
+    def request(self, name):
+        """Ask for an immediate refresh; merged into a fetch already in flight
+
+        A source backing off after failures is tried once, half-open.
+        """
+        with self._lock:
+            source = self.sources.get(name)
+            if source is None or source.in_flight:
+                return
+            source.breaker.probe()
+            self._schedule(source, self.clock())
+            self._wake.notify()
+
+    def refresh_all(self):
+        """Ask for an immediate refresh of every source"""
+        for name in list(self.sources):
+            self.request(name)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, name="refresh-scheduler",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=0):
+        """Stop the loop and cancel fetches that have not started yet
+
+        Waits up to timeout seconds for running fetches; their results are
+        dropped either way. Returns False if some were still running.
+        """
+        with self._lock:
+            self.running = False
+            for source in self.sources.values():
+                # Late results of running fetches are no longer published
+                source.generation += 1
+            self._wake.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        if self.pool is not None:
+            return self.pool.shutdown(timeout)
+        return True
+
+    def _schedule(self, source, deadline):
+        # Caller holds the lock
+        source.deadline = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), source.name))
+
+    def _next_deadline(self):
+        # Caller holds the lock; drops stale heap entries on the way
+        while self._heap:
+            deadline, _, name = self._heap[0]
+            source = self.sources.get(name)
+            if source is None or source.in_flight or source.deadline != deadline:
+                heapq.heappop(self._heap)
+                continue
+            return deadline
+        return None
+
+    def _next_timeout(self):
+        # Caller holds the lock
+        timeouts = [s.started + s.timeout for s in self.sources.values()
+                    if s.in_flight and s.timeout]
+        return min(timeouts) if timeouts else None
+
+    def status(self):
+        """Breaker state, next run, in-flight and hung flags of every source as plain dicts"""
+        with self._lock:
+            now = self.clock()
+            return {name: dict(source.breaker.as_dict(), in_flight=source.in_flight,
+                               hung=source.running and not source.in_flight,
+                               due_in=None if source.in_flight
+                               else max(0.0, source.deadline - now))
+                    for name, source in self.sources.items()}
+
+    def next_deadline(self):
+        """Monotonic time when the next source is due, or None"""
+        with self._lock:
+            return self._next_deadline()
+
+    def _pop_due(self):
+        now = self.clock()
+        due = []
+        hung = []
+        with self._lock:
+            while True:
+                deadline = self._next_deadline()
+                if deadline is None or deadline > now:
+                    break
+                _, _, name = heapq.heappop(self._heap)
+                source = self.sources[name]
+                if not source.breaker.allow():
+                    self._schedule(source, source.breaker.retry_at)
+                    continue
+                if source.running:
+                    # A timed-out fetch cannot be interrupted; running it again
+                    # would only tie up another worker
+                    self._finish(source, ok=False, error="previous run still running")
+                    hung.append(source)
+                    continue
+                source.in_flight = True
+                source.started = now
+                source.generation += 1
+                due.append((source, source.generation))
+        for source in hung:
+            print(f"Refresh skipped ({source.name}): previous run still running")
+            self._report(source.name, False)
+        return due
+
+    def run_pending(self):
+        """Start every source that is due now; returns how many started
+
+        A source whose timed-out fetch is still running is not started
+        again; the skip counts as another timeout.
+        """
+        due = self._pop_due()
+        for source, generation in due:
+            if self.pool is None:
+                self._run(source, generation)
+            else:
+                source.future = self.pool.submit(self._run, source, generation,
+                                                 key=source.name)
+        return len(due)
+
+    def expire_timeouts(self):
+        """Give up on fetches that have run past their timeout"""
+        now = self.clock()
+        with self._lock:
+            expired = [s for s in self.sources.values()
+                       if s.in_flight and s.timeout and s.started + s.timeout <= now]
+            for source in expired:
+                if source.future is not None:
+                    # Only a fetch still queued can be cancelled; a running
+                    # one keeps source.running set until it returns
+                    source.future.cancel()
+                source.generation += 1
+                self._finish(source, ok=False, error=f"timeout after {source.timeout} s")
+        for source in expired:
+            print(f"Refresh timeout ({source.name}) after {source.timeout} s")
+            self._report(source.name, False)
+        return len(expired)
+
+    def _loop(self):
+        """Main scheduler loop"""
+        while True:
+            with self._lock:
+                while self.running:
+                    wake_at = [t for t in (self._next_deadline(), self._next_timeout())
+                               if t is not None]
+                    timeout = min(wake_at) - self.clock() if wake_at else None
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._wake.wait(timeout)
+                if not self.running:
+                    return
+            self.expire_timeouts()
+            try:
+                self.run_pending()
+            except RuntimeError:
+                # Worker pool was shut down by stop()
+                return
+
+    def _delay(self, source, ok, error=None):
+        """Next delay: the interval on success, the breaker's backoff on failure"""
+        if not ok:
+            return source.breaker.failure(error)
+
+        source.breaker.success()
+        delay = source.interval
+        low = -source.jitter
+        if source.next_delay is not None:
+            delay = source.next_delay(delay)
+            if delay != source.interval:
+                # Never wake before an externally given deadline
+                low = 0.0
+        return max(0.0, delay + source.interval * self.rng.uniform(low, source.jitter))
+
+    def _finish(self, source, ok, error=None):
+        # Caller holds the lock
+        source.in_flight = False
+        source.future = None
+        self._schedule(source, self.clock() + self._delay(source, ok, error))
+        self._wake.notify()
+
+    def _run(self, source, generation):
+        """Fetch one source and fan the result out"""
+        data = None
+        ok = True
+        ran = False
+        error = None
+        with self._lock:
+            source.running = True
+        try:
+            if source.condition is None or source.condition():
+                ran = True
+                data = source.fetch()
+                if data is NOT_DUE:
+                    data = None
+                    ok = None
+        except Exception as e:
+            ok = False
+            ran = True
+            error = e
+            print(f"Refresh error ({source.name}): {e}")
+
+        with self._lock:
+            source.running = False
+            if source.generation != generation:
+                # Timed out meanwhile; already rescheduled as a failure
+                return
+            self._finish(source, ok is not False, error)
+
+        if data:
+            self.publish(source.name, data)
+        if ran:
+            self._report(source.name, ok)
+
+    def _report(self, name, ok):
+        with self._lock:
+            callbacks = list(self.watchers)
+        for callback in callbacks:
+            try:
+                callback(name, ok)
+            except Exception as e:
+                print(f"Watcher error ({name}): {e}")
+
+    def publish(self, name, data):
+        """Deliver data to every subscriber of name"""
+        with self._lock:
+            callbacks = list(self.subscribers.get(name, []))
+        for callback in callbacks:
+            try:
+                callback(data)
+            except Exception as e:
+                print(f"Subscriber error ({name}): {e}")
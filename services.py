@@ -3,12 +3,41 @@ Background Services and Android Widgets
 Handles data updates, notifications, and widget management
 """
 
-import threading
 import time
-import json
-from datetime import datetime, timedelta
-from kivy.clock import Clock
-from kivy.utils import platform
+import os
+import sys
+from collections import deque
+from datetime import date, datetime
+
+from breaker import CircuitOpenError
+from cache import CacheStore, FeedIndex, RequestBudget
+from feedstream import read_feed
+from finnish_calendar import CalendarIndex, NameDayStore
+from forecast import Forecast
+from market_calendar import MarketHours
+from quotes import Quote, QuoteCache, download_quotes
+from scheduler import NOT_DUE, RefreshScheduler
+from snapshot import DashboardSnapshot
+from workers import WorkerPool
+from worldclock import DEFAULT_WORLD_CLOCKS
+
+def detect_platform():
+    """kivy.utils.platform, without importing Kivy if it is not imported yet
+    
+    The data layer runs headless (see headless.py) on machines without Kivy.
+    """
+    if 'kivy' in sys.modules:
+        from kivy.utils import platform
+        return platform
+    if 'ANDROID_ARGUMENT' in os.environ or 'P4A_BOOTSTRAP' in os.environ:
+        return 'android'
+    if sys.platform.startswith('win'):
+        return 'win'
+    if sys.platform == 'darwin':
+        return 'macosx'
+    return sys.platform
+
+platform = detect_platform()
 
 if platform == 'android':
     from jnius import autoclass, PythonJavaClass, java_method
@@ -24,110 +53,203 @@ if platform == 'android':
     AppWidgetManager = autoclass('android.appwidget.AppWidgetManager')
     RemoteViews = autoclass('android.widget.RemoteViews')
 
+WEATHER_ICONS = {
+    "01d": "☀️", "01n": "🌙", "02d": "🌤️", "02n": "☁️",
+    "03d": "☁️", "03n": "☁️", "04d": "☁️", "04n": "☁️",
+    "09d": "🌧️", "09n": "🌧️", "10d": "🌦️", "10n": "🌧️",
+    "11d": "⛈️", "11n": "⛈️", "13d": "❄️", "13n": "❄️",
+    "50d": "🌫️", "50n": "🌫️"
+}
+
+WEATHER_DESC_FI = {
+    "01d": "Selkeä", "01n": "Selkeä", "02d": "Melko selkeä", "02n": "Melko selkeä",
+    "03d": "Pilvistä", "03n": "Pilvistä", "04d": "Pilvistä", "04n": "Pilvistä",
+    "09d": "Sadetta", "09n": "Sadetta", "10d": "Sadekuuroja", "10n": "Sadekuuroja",
+    "11d": "Ukkosta", "11n": "Ukkosta", "13d": "Lunta", "13n": "Lunta",
+    "50d": "Sumua", "50n": "Sumua"
+}
+
 class BackgroundService:
     """Manages background data updates and notifications"""
     
+    # Refresh intervals in minutes
+    WEATHER_INTERVAL = 30
+    NEWS_INTERVAL = 15
+    STOCKS_INTERVAL = 30
+    WIDGETS_INTERVAL = 15
+    
+    # Recent alerts kept in memory
+    MAX_ALERTS = 20
+    
+    # Per-source fetch timeouts in seconds; sources are fetched concurrently
+    FETCH_TIMEOUTS = {
+        'weather': 15,
+        'news': 30,
+        'stocks': 45,
+        'widgets': 15
+    }
+    
     def __init__(self, data_manager, settings):
         self.data_manager = data_manager
         self.settings = settings
-        self.running = True
-        self.last_update = {}
+        self.alerts = deque(maxlen=self.MAX_ALERTS)
         
-        # Start background thread
-        self.background_thread = threading.Thread(target=self.background_loop, daemon=True)
-        self.background_thread.start()
+        # Per-install overrides of the weather API key's request budget
+        budget = data_manager.weather_budget
+        for window, setting in (('minute', 'weather_budget_minute'), ('day', 'weather_budget_day')):
+            if settings.get(setting):
+                budget.limits[window] = (settings.get(setting), budget.limits[window][1])
+        
+        # Single owner of every refresh; UI and widgets subscribe to it
+        # Stale-while-revalidate: cached data is shown at once and a source
+        # is first fetched when its cached copy expires, so a fresh cache
+        # costs no requests at startup
+        self.scheduler = RefreshScheduler()
+        timeouts = self.FETCH_TIMEOUTS
+        expires_in = data_manager.expires_in
+        self.scheduler.add_source('weather', self.update_weather, self.WEATHER_INTERVAL * 60,
+                                  condition=lambda: bool(self.settings.get('api_key')),
+                                  timeout=timeouts['weather'],
+                                  first_delay=data_manager.weather_expires_in(
+                                      self.weather_cities()))
+        self.scheduler.add_source('news', self.update_news, self.NEWS_INTERVAL * 60,
+                                  timeout=timeouts['news'], first_delay=expires_in('news'))
+        self.scheduler.add_source('stocks', self.update_stocks, self.STOCKS_INTERVAL * 60,
+                                  next_delay=self.stocks_delay, timeout=timeouts['stocks'],
+                                  first_delay=expires_in('stocks'))
+        self.scheduler.add_source('widgets', self.update_widgets, self.WIDGETS_INTERVAL * 60,
+                                  timeout=timeouts['widgets'])
+        
+        self.scheduler.subscribe('weather', self.on_weather_data)
     
-    def background_loop(self):
-        """Main background update loop"""
-        while self.running:
-            try:
-                now = datetime.now()
-                
-                # Update weather every 30 minutes
-                if self.should_update('weather', 30):
-                    self.update_weather()
-                    self.last_update['weather'] = now
-                
-                # Update news every 15 minutes
-                if self.should_update('news', 15):
-                    self.update_news()
-                    self.last_update['news'] = now
-                
-                # Update stocks every 30 minutes (during market hours)
-                if self.should_update('stocks', 30) and self.is_market_hours():
-                    self.update_stocks()
-                    self.last_update['stocks'] = now
-                
-                # Update widgets every 15 minutes
-                if self.should_update('widgets', 15):
-                    self.update_widgets()
-                    self.last_update['widgets'] = now
-                
-                # Sleep for 5 minutes before next check
-                time.sleep(300)
-                
-            except Exception as e:
-                print(f"Background service error: {e}")
-                time.sleep(60)  # Wait 1 minute on error
+    def start(self):
+        """Start background refreshes"""
+        self.scheduler.start()
     
-    def should_update(self, service, interval_minutes):
-        """Check if service should be updated"""
-        if service not in self.last_update:
-            return True
+    def subscribe(self, source, callback):
+        """Receive fresh data for source ('weather', 'forecast', 'news' or 'stocks')"""
+        self.scheduler.subscribe(source, callback)
+    
+    def watch(self, callback):
+        """Receive callback(source, ok) after every revalidation attempt"""
+        self.scheduler.watch(callback)
+    
+    def weather_budget(self):
+        """Remaining weather requests of the configured API key per window, or None"""
+        api_key = self.settings.get('api_key')
+        if not api_key:
+            return None
+        return self.data_manager.weather_budget.remaining(api_key)
+    
+    def diagnostics(self):
+        """Breaker state of every source and host, for the diagnostics view"""
+        workers = {'weather': self.data_manager.workers.stats()}
+        if self.scheduler.pool is not None:
+            workers['refresh'] = self.scheduler.pool.stats()
+        return dict(self.data_manager.get_host_status(), sources=self.scheduler.status(),
+                    workers=workers)
+    
+    def is_stale(self, source, updated_at, now=None):
+        """Whether data last revalidated at updated_at (Unix time) is past the stale limit
         
-        time_diff = datetime.now() - self.last_update[service]
-        return time_diff.total_seconds() > (interval_minutes * 60)
+        Quotes fetched after the last close stay current until markets open.
+        """
+        now = time.time() if now is None else now
+        if source == 'stocks' and not self.data_manager.market.is_open(now):
+            return updated_at < self.data_manager.market.last_close(now)
+        return now - updated_at > self.settings.get('stale_minutes', 90) * 60
+    
+    def refresh_all(self):
+        """Refresh every source now"""
+        self.scheduler.refresh_all()
     
     def is_market_hours(self):
-        """Check if it's market hours (simplified)"""
-        now = datetime.now()
-        # Simple check: weekdays 9-17
-        return now.weekday() < 5 and 9 <= now.hour < 17
+        """Check if any exchange of the configured stocks is open"""
+        return self.data_manager.market.is_open()
+    
+    def stocks_delay(self, interval):
+        """Poll stocks while markets are open, otherwise sleep until the next open"""
+        return self.data_manager.market.refresh_delay(interval)
+    
+    def weather_cities(self):
+        """Default city first, then the extra weather_cities setting, without duplicates"""
+        cities = [self.settings.get('default_city', 'Helsinki')]
+        cities += self.settings.get('weather_cities', '').split(',')
+        unique = []
+        for city in (city.strip() for city in cities):
+            if city and city not in unique:
+                unique.append(city)
+        return unique
     
     def update_weather(self):
-        """Update weather data in background"""
-        try:
-            api_key = self.settings.get('api_key')
-            city = self.settings.get('default_city', 'Helsinki')
-            
-            if api_key:
-                weather_data = self.data_manager.fetch_weather_online(city, api_key)
-                if weather_data:
-                    # Check for weather alerts
-                    self.check_weather_alerts(weather_data)
-                    print("Weather updated in background")
-        except Exception as e:
-            print(f"Background weather update error: {e}")
+        """Fetch weather of every city, default city first; only runs with an API key"""
+        api_key = self.settings.get('api_key')
+        
+        cities = self.weather_cities()
+        due = self.data_manager.due_cities(cities)
+        forecast_due = self.data_manager.is_due('forecast', cities[0])
+        if not due and not forecast_due:
+            return NOT_DUE
+        
+        weather_data = self.data_manager.fetch_weather(cities, api_key)
+        if weather_data is None:
+            # Raising lets the scheduler back off
+            raise RuntimeError("weather fetch failed")
+        
+        # The forecast rides on the weather refresh and shares its TTL
+        forecast = self.data_manager.fetch_forecast(cities[0], api_key)
+        if forecast is not None:
+            self.scheduler.publish('forecast', forecast)
+        
+        refreshed = (len(self.data_manager.due_cities(due)) < len(due)
+                     or forecast_due and not self.data_manager.is_due('forecast', cities[0]))
+        if not refreshed:
+            # Every request was over the API key's budget
+            return NOT_DUE
+        return weather_data
     
     def update_news(self):
-        """Update news data in background"""
-        try:
-            # Fetch news (implementation from main app)
-            print("News updated in background")
-        except Exception as e:
-            print(f"Background news update error: {e}")
+        """Fetch news items not seen before"""
+        new_items = self.data_manager.fetch_news()
+        if new_items is None:
+            raise RuntimeError("news fetch failed")
+        return new_items
     
     def update_stocks(self):
-        """Update stock data in background"""
-        try:
-            # Fetch stocks (implementation from main app)
-            print("Stocks updated in background")
-        except Exception as e:
-            print(f"Background stocks update error: {e}")
+        """Fetch stock data"""
+        if self.data_manager.quotes.is_fresh():
+            return NOT_DUE
+        stocks_data = self.data_manager.fetch_stocks()
+        if not stocks_data:
+            raise RuntimeError("stocks fetch failed")
+        return stocks_data
     
     def update_widgets(self):
-        """Update all Android widgets"""
+        """Update all Android widgets and drop long-expired cache entries"""
+        # Weather is cached per city, so cities removed from settings
+        # would otherwise stay in the database for good
+        self.data_manager.purge_cache()
+        
         if platform == 'android':
             try:
                 # Update clock widget
                 ClockWidget.update_widget()
                 
                 # Update weather widget
-                WeatherWidget.update_widget(self.data_manager)
+                WeatherWidget.update_widget(self.data_manager, self.weather_cities()[0])
                 
                 print("Widgets updated")
             except Exception as e:
                 print(f"Widget update error: {e}")
+        return None
+    
+    def on_weather_data(self, weather_data):
+        """Refresh weather widget and check alerts for the default city"""
+        if platform == 'android':
+            WeatherWidget.update_widget(self.data_manager, self.weather_cities()[0])
+        
+        if self.settings.get('weather_alerts', True):
+            self.check_weather_alerts(weather_data[0])
     
     def check_weather_alerts(self, weather_data):
         """Check for weather conditions that need alerts"""
@@ -154,7 +276,8 @@ class BackgroundService:
             )
     
     def send_notification(self, title, message):
-        """Send push notification"""
+        """Send push notification; recent alerts are also kept for snapshots"""
+        self.alerts.append({'title': title, 'message': message, 'time': time.time()})
         if platform == 'android':
             try:
                 notification.notify(
@@ -167,9 +290,9 @@ class BackgroundService:
             except Exception as e:
                 print(f"Notification error: {e}")
     
-    def stop(self):
-        """Stop background service"""
-        self.running = False
+    def stop(self, timeout=0):
+        """Stop refreshes; queued fetches are cancelled, running ones waited for up to timeout"""
+        return self.scheduler.stop(timeout)
 
 class ClockWidget:
     """Android home screen clock widget"""
@@ -216,14 +339,14 @@ class WeatherWidget:
     """Android home screen weather widget"""
     
     @staticmethod
-    def update_widget(data_manager):
-        """Update weather widget on home screen"""
+    def update_widget(data_manager, city):
+        """Update weather widget on home screen from the city's cached weather"""
         if platform != 'android':
             return
             
         try:
             # Get latest weather data
-            weather_data = data_manager.load_from_db('weather')
+            weather_data = data_manager.load_from_db('weather', key=city)
             if not weather_data:
                 return
             
@@ -271,9 +394,9 @@ class NotificationManager:
         self.settings = settings
         self.sent_today = set()  # Track notifications sent today
     
-    def check_daily_notifications(self):
-        """Check and send daily notifications"""
-        now = datetime.now()
+    def check_daily_notifications(self, now=None):
+        """Check and send daily notifications; called on every minute tick"""
+        now = datetime.now() if now is None else now
         
         # Reset daily tracking at midnight
         if now.hour == 0 and now.minute == 0:
@@ -326,14 +449,11 @@ class NotificationManager:
     
     def get_nameday(self, month, day):
         """Get name day for given date"""
-        # Simplified implementation
-        return None
+        return self.data_manager.name_days.get(month, day) or None
     
     def check_today_holiday(self):
         """Check if today is a Finnish holiday"""
-        today = datetime.now()
-        from main import FINNISH_HOLIDAYS  # Import from main app
-        return FINNISH_HOLIDAYS.get((today.month, today.day))
+        return self.data_manager.calendar.day(date.today()).holiday or None
 
 class SettingsManager:
     """Manages app settings with Android SharedPreferences"""
@@ -357,7 +477,14 @@ class SettingsManager:
                     'nameday_notifications': prefs.getBoolean('nameday_notifications', True),
                     'holiday_notifications': prefs.getBoolean('holiday_notifications', True),
                     'weather_alerts': prefs.getBoolean('weather_alerts', True),
-                    'update_interval': prefs.getInt('update_interval', 15)
+                    'update_interval': prefs.getInt('update_interval', 15),
+                    'staged_startup': prefs.getBoolean('staged_startup', True),
+                    'stale_minutes': prefs.getInt('stale_minutes', 90),
+                    'show_seconds': prefs.getBoolean('show_seconds', True),
+                    'world_clocks': prefs.getString('world_clocks', DEFAULT_WORLD_CLOCKS),
+                    'weather_cities': prefs.getString('weather_cities', ''),
+                    'weather_budget_minute': prefs.getInt('weather_budget_minute', 0),
+                    'weather_budget_day': prefs.getInt('weather_budget_day', 0)
                 }
             except Exception as e:
                 print(f"Settings load error: {e}")
@@ -396,7 +523,15 @@ class SettingsManager:
             'nameday_notifications': True,
             'holiday_notifications': True,
             'weather_alerts': True,
-            'update_interval': 15
+            'update_interval': 15,
+            'staged_startup': True,
+            'stale_minutes': 90,
+            'show_seconds': True,
+            'world_clocks': DEFAULT_WORLD_CLOCKS,
+            'weather_cities': '',
+            # Weather API request budget overrides; 0 keeps the built-in limits
+            'weather_budget_minute': 0,
+            'weather_budget_day': 0
         }
     
     def get(self, key, default=None):
@@ -408,6 +543,432 @@ class SettingsManager:
         self.settings[key] = value
         self.save_settings()
 
+def get_data_dir():
+    """Get writable directory for app data"""
+    if os.environ.get('INFONAYTTO_DATA_DIR'):
+        return os.environ['INFONAYTTO_DATA_DIR']
+    if 'kivy' in sys.modules:
+        try:
+            from kivy.app import App
+            app = App.get_running_app()
+            if app is not None:
+                return app.user_data_dir
+        except Exception as e:
+            print(f"Data dir lookup error: {e}")
+    return os.getcwd()
+
+class DataManager:
+    """Fetches weather, news and stocks and caches them in SQLite"""
+    
+    WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+    WEATHER_GROUP_URL = "https://api.openweathermap.org/data/2.5/group"
+    FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
+    
+    # The group endpoint takes at most 20 city IDs
+    WEATHER_GROUP_SIZE = 20
+    # Parallel by-name weather requests, on one pool shared by every refresh
+    WEATHER_WORKERS = 4
+    
+    # OpenWeatherMap free tier: 60 calls per minute; the day window keeps
+    # one shared key from being drained by a single install
+    WEATHER_BUDGET = {
+        'minute': (60, 60),
+        'day': (1000, 24 * 3600)
+    }
+    
+    NEWS_FEEDS = [
+        ("Yle", "https://feeds.yle.fi/uutiset/v1/majorHeadlines/YLE_UUTISET.rss"),
+        ("HS", "https://www.hs.fi/rss/tuoreimmat.xml")
+    ]
+    
+    STOCK_SYMBOLS = [
+        ("NOKIA.HE", "Nokia"),
+        ("NDA-FI.HE", "Nordea"),
+        ("KNEBV.HE", "Kone"),
+        ("FORTUM.HE", "Fortum"),
+        ("SAMPO.HE", "Sampo"),
+        ("UPM.HE", "UPM")
+    ]
+    
+    # Headlines kept for the news card
+    NEWS_LIMIT = 10
+    
+    # Current weather and forecast are refreshed together and expire together
+    WEATHER_TTL = 30 * 60
+    
+    # Expired entries are still shown until revalidated; drop them after this
+    PURGE_AFTER = 7 * 24 * 3600
+    
+    # Entries expiring within this many seconds are refreshed already: a
+    # scheduled run may come up to 10% of its 30 min interval early
+    REFRESH_AHEAD = 5 * 60
+    
+    # Cache lifetimes in seconds
+    CACHE_TTL = {
+        'weather': WEATHER_TTL,
+        'forecast': WEATHER_TTL,
+        'weather_id': 365 * 24 * 3600,
+        'news': 15 * 60,
+        'stocks': 30 * 60
+    }
+    
+    def __init__(self, db_path=None):
+        if db_path is None:
+            db_path = os.path.join(get_data_dir(), "infonaytto.db")
+        self.cache = CacheStore(db_path)
+        data_dir = os.path.dirname(os.path.abspath(db_path))
+        # What the UI last rendered, read back on a cold start before the cache
+        self.snapshot = DashboardSnapshot(os.path.join(data_dir, "dashboard.snap"))
+        self.name_days = NameDayStore(cache_dir=data_dir)
+        self.calendar = CalendarIndex(self.name_days, cache_dir=data_dir)
+        self.news_index = FeedIndex(self.cache)
+        self._http = None
+        self._city_ids = {}
+        self.workers = WorkerPool("weather", self.WEATHER_WORKERS)
+        self.weather_budget = RequestBudget(self.cache, self.WEATHER_BUDGET)
+        self._budget_warned = False
+        
+        # Serve quotes from memory until they expire or the market opens
+        self.market = MarketHours([symbol for symbol, _ in self.STOCK_SYMBOLS])
+        # Expiring REFRESH_AHEAD early keeps a run that comes early within its
+        # jitter from finding the quotes still fresh
+        self.quotes = QuoteCache(self.CACHE_TTL['stocks'] - self.REFRESH_AHEAD, self.market)
+        entry = self.cache.get_entry('stocks')
+        if entry:
+            self.quotes.update([Quote(**item) for item in entry['data']],
+                               fetched_at=entry['fetched_at'])
+    
+    @property
+    def http(self):
+        """Shared HTTP client; requests is imported on first use, off the UI thread"""
+        if self._http is None:
+            from http_client import get_http_client
+            self._http = get_http_client()
+        return self._http
+    
+    def _conditional_get(self, url, params, source, key='default'):
+        """GET url; returns (response, None) or (None, cached data) when unchanged"""
+        response = self.http.get(url, params=params, source=source)
+        if response.status_code == 304:
+            cached = self.load_from_db(source, key)
+            if cached is not None:
+                # Still valid: extend cache lifetime without parsing anything
+                self.save_to_db(source, cached, key=key)
+                return None, cached
+            # Validators are useless without the cached copy
+            response = self.http.get(url, params=params, source=source, conditional=False)
+        
+        response.raise_for_status()
+        return response, None
+    
+    def _weather_record(self, data, city):
+        """Weather record for the UI and the cache from an OpenWeatherMap result"""
+        icon_code = data['weather'][0]['icon']
+        description = data['weather'][0].get('description', '').capitalize()
+        return {
+            'city': data.get('name', city),
+            'temperature': data['main']['temp'],
+            'feels_like': data['main'].get('feels_like'),
+            'humidity': data['main'].get('humidity'),
+            'wind_speed': data.get('wind', {}).get('speed'),
+            'description': description or WEATHER_DESC_FI.get(icon_code, ''),
+            'icon': WEATHER_ICONS.get(icon_code, "☀️"),
+            'icon_code': icon_code
+        }
+    
+    def city_id(self, city):
+        """OpenWeatherMap ID of a city name, once resolved by a by-name fetch"""
+        city_id = self._city_ids.get(city)
+        if city_id is None:
+            city_id = self.load_from_db('weather_id', key=city)
+            if city_id is not None:
+                self._city_ids[city] = city_id
+        return city_id
+    
+    def _spend(self, api_key):
+        """Take one request from the API key's budget; False means serve the cache
+        
+        Nothing is spent while the weather host is known to be down.
+        """
+        if self.http.is_down(self.WEATHER_URL):
+            return False
+        if self.weather_budget.acquire(api_key):
+            self._budget_warned = False
+            return True
+        if not self._budget_warned:
+            print(f"Weather request budget exhausted: {self.weather_budget.remaining(api_key)}")
+            self._budget_warned = True
+        return False
+    
+    def fetch_weather_online(self, city, api_key):
+        """Fetch current weather of one city by name and cache it per city"""
+        if not self._spend(api_key):
+            return self.load_from_db('weather', key=city)
+        try:
+            response, cached = self._conditional_get(self.WEATHER_URL, {
+                'q': city,
+                'appid': api_key,
+                'units': 'metric',
+                'lang': 'fi'
+            }, 'weather', key=city)
+            if cached is not None:
+                return cached
+            data = response.json()
+            
+            weather_data = self._weather_record(data, city)
+            self.save_to_db('weather', weather_data, key=city)
+            if data.get('id'):
+                self._city_ids[city] = data['id']
+                self.save_to_db('weather_id', data['id'], key=city)
+            return weather_data
+        except Exception as e:
+            print(f"Weather fetch error ({city}): {e}")
+            return None
+    
+    def _fetch_weather_group(self, cities, api_key):
+        """Fetch up to WEATHER_GROUP_SIZE resolved cities in one request; returns cities done"""
+        ids = {self.city_id(city): city for city in cities}
+        response = self.http.get(self.WEATHER_GROUP_URL, params={
+            'id': ",".join(str(city_id) for city_id in ids),
+            'appid': api_key,
+            'units': 'metric',
+            'lang': 'fi'
+        }, source='weather', conditional=False)
+        response.raise_for_status()
+        
+        done = []
+        for data in response.json().get('list', []):
+            city = ids.get(data.get('id'))
+            if city is not None:
+                self.save_to_db('weather', self._weather_record(data, city), key=city)
+                done.append(city)
+        return done
+    
+    def fetch_weather(self, cities, api_key):
+        """Refresh every city whose cached weather is due; returns all cities' weather
+        
+        Cities with a known ID share one group request per WEATHER_GROUP_SIZE
+        cities; the rest (and any failed group) are fetched by name, at most
+        WEATHER_WORKERS at a time. Requests beyond the API key's budget are
+        skipped and those cities keep their cached weather. Returns weather
+        records in the order of cities, or None if nothing could be fetched
+        or loaded.
+        """
+        due = self.due_cities(cities)
+        by_name = [city for city in due if self.city_id(city) is None]
+        resolved = [city for city in due if self.city_id(city) is not None]
+        
+        failed = 0
+        for i in range(0, len(resolved), self.WEATHER_GROUP_SIZE):
+            chunk = resolved[i:i + self.WEATHER_GROUP_SIZE]
+            if not self._spend(api_key):
+                # Over budget: these cities keep their cached weather
+                continue
+            try:
+                done = self._fetch_weather_group(chunk, api_key)
+            except Exception as e:
+                print(f"Weather group fetch error: {e}")
+                done = []
+            by_name.extend(city for city in chunk if city not in done)
+        
+        if by_name:
+            # A city already queued by an overlapping refresh is fetched once
+            results = self.workers.map(lambda city: self.fetch_weather_online(city, api_key),
+                                       by_name, key=lambda city: ('weather', city))
+            failed = results.count(None)
+        
+        weather = [entry['data'] for entry in self.load_weather(cities)]
+        if (due and failed == len(due)) or not weather:
+            return None
+        return weather
+    
+    def fetch_forecast(self, city, api_key):
+        """Fetch the 5-day/3-hour forecast of city unless cached; returns a Forecast or None"""
+        if not self.is_due('forecast', city) or not self._spend(api_key):
+            return self.load_forecast(city)
+        try:
+            response, cached = self._conditional_get(self.FORECAST_URL, {
+                'q': city,
+                'appid': api_key,
+                'units': 'metric',
+                'lang': 'fi'
+            }, 'forecast', key=city)
+            if cached is not None:
+                return Forecast.from_dict(cached)
+            forecast = Forecast.from_owm(response.json(), city)
+        except Exception as e:
+            print(f"Forecast fetch error ({city}): {e}")
+            return None
+        
+        self.save_to_db('forecast', forecast.to_dict(), key=city)
+        return forecast
+    
+    def load_forecast(self, city):
+        """Cached Forecast of city, or None"""
+        data = self.load_from_db('forecast', key=city)
+        return Forecast.from_dict(data) if data else None
+    
+    def load_weather(self, cities):
+        """Cached weather entries of cities, in order, skipping cities without data"""
+        entries = [self.load_entry('weather', city) for city in cities]
+        return [entry for entry in entries if entry]
+    
+    def fetch_news(self, limit=10):
+        """Ingest RSS feeds; returns only items not seen before, newest first
+
+        Returns None if every feed failed.
+        """
+        new_items = []
+        failed = 0
+        for source, url in self.NEWS_FEEDS:
+            try:
+                new_items.extend(self._ingest_feed(source, url, limit))
+            except Exception as e:
+                failed += 1
+                print(f"News fetch error ({source}): {e}")
+        
+        if failed == len(self.NEWS_FEEDS):
+            return None
+        
+        if new_items:
+            new_items.sort(key=lambda item: item['published_at'], reverse=True)
+            self.save_to_db('news', self.news_index.latest(self.NEWS_LIMIT))
+        return new_items
+    
+    def _ingest_feed(self, source, url, limit):
+        """Stream one feed and store entries up to the first GUID already seen"""
+        seen = self.news_index.guids(source)
+        # Without indexed items a 304 would leave nothing to show
+        response = self.http.get(url, source='news', conditional=bool(seen), stream=True)
+        try:
+            if response.status_code == 304:
+                return []
+            response.raise_for_status()
+            entries = read_feed(self.http.iter_content(response, 'news'), limit, seen)
+        finally:
+            # Stops the download if the reader finished early
+            response.close()
+        
+        now = time.time()
+        items = [{
+            'guid': entry['guid'],
+            'source': source,
+            'title': entry['title'],
+            'link': entry['link'],
+            'published': entry['published'],
+            'published_at': entry['published_at'] or now
+        } for entry in entries]
+        
+        self.news_index.add(source, items)
+        return items
+    
+    def fetch_stocks(self):
+        """Fetch stock quotes of every symbol concurrently and cache them"""
+        if self.quotes.is_fresh():
+            return self.quotes.as_dicts()
+        
+        # yfinance bypasses the shared client, so Yahoo gets its own breaker here
+        breaker = self.http.breakers.get('yfinance')
+        try:
+            breaker.check()
+            quotes = download_quotes(self.STOCK_SYMBOLS)
+        except CircuitOpenError as e:
+            print(f"Stock fetch skipped: {e}")
+            return None
+        except Exception as e:
+            breaker.failure(e)
+            print(f"Stock fetch error: {e}")
+            return None
+        
+        if not quotes:
+            # yfinance reports most failures as an empty download
+            breaker.failure("no quotes")
+            return None
+        breaker.success()
+        
+        self.quotes.update(quotes)
+        stocks_data = self.quotes.as_dicts()
+        self.save_to_db('stocks', stocks_data)
+        return stocks_data
+    
+    def save_to_db(self, source, data, key='default'):
+        """Store data in the local cache"""
+        ttl = self.CACHE_TTL.get(source, 15 * 60)
+        try:
+            self.cache.put(source, data, ttl, key=key)
+        except Exception as e:
+            print(f"Cache write error ({source}): {e}")
+    
+    def purge_cache(self):
+        """Delete cache entries expired for over PURGE_AFTER seconds; returns how many"""
+        try:
+            return self.cache.purge_expired(older_than=self.PURGE_AFTER)
+        except Exception as e:
+            print(f"Cache purge error: {e}")
+            return 0
+    
+    def load_entry(self, source, key='default'):
+        """Cached data with its fetch time ({'data', 'fetched_at', 'expires_at'}) or None"""
+        try:
+            return self.cache.get_entry(source, key)
+        except Exception as e:
+            print(f"Cache read error ({source}): {e}")
+            return None
+    
+    def last_fetched_at(self):
+        """Unix time of the newest cache write; a UI snapshot older than this is outdated"""
+        try:
+            return self.cache.last_fetched_at()
+        except Exception as e:
+            print(f"Cache read error: {e}")
+            return 0
+    
+    def weather_expires_in(self, cities):
+        """Seconds until the first of cities' cached weather expires; 0 if any is missing"""
+        return min((self.expires_in('weather', city) for city in cities), default=0)
+    
+    def is_due(self, source, key='default'):
+        """Whether the cached copy of source is missing or expires within REFRESH_AHEAD"""
+        return self.expires_in(source, key) <= self.REFRESH_AHEAD
+    
+    def due_cities(self, cities):
+        """Cities whose cached weather is due for a refresh, in order"""
+        return [city for city in cities if self.is_due('weather', city)]
+    
+    def expires_in(self, source, key='default'):
+        """Seconds until the cached copy of source expires; 0 if missing or expired"""
+        entry = self.load_entry(source, key)
+        if entry is None:
+            return 0
+        return max(0.0, entry['expires_at'] - time.time())
+    
+    def load_from_db(self, source, key='default'):
+        """Load cached data without touching the network"""
+        try:
+            return self.cache.get(source, key)
+        except Exception as e:
+            print(f"Cache read error ({source}): {e}")
+            return None
+    
+    def get_http_stats(self):
+        """Per-source 304 hit rate and bytes saved"""
+        return self.http.get_stats()
+    
+    def get_host_status(self):
+        """Circuit breaker state per host and whether the network is up"""
+        return {
+            'network': self.http.network.as_dict(),
+            'hosts': self.http.get_breakers()
+        }
+    
+    def close(self, timeout=0):
+        """Cancel queued weather requests and close cache connections
+        
+        Waits up to timeout seconds for requests already running.
+        """
+        self.workers.shutdown(timeout)
+        self.cache.close()
+
 class AndroidIntegration:
     """Handles Android-specific integrations"""
     
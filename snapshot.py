@@ -0,0 +1,170 @@
+"""
+Dashboard Snapshot
+What the dashboard last rendered, in one compact versioned binary file for cold starts
+"""
+
+import mmap
+import os
+import struct
+import time
+from array import array
+
+MAGIC = b'INFS'
+FORMAT_VERSION = 1
+
+# Magic, format version, body length, Unix time written
+HEADER = struct.Struct('<4sHId')
+
+_LENGTH = struct.Struct('<I')
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+
+def _pack(value, out):
+    if value is None:
+        out.append(b'N')
+    elif value is True:
+        out.append(b'T')
+    elif value is False:
+        out.append(b'F')
+    elif isinstance(value, int):
+        out.append(b'i' + _INT.pack(value))
+    elif isinstance(value, float):
+        out.append(b'd' + _FLOAT.pack(value))
+    elif isinstance(value, str):
+        encoded = value.encode('utf-8')
+        out.append(b's' + _LENGTH.pack(len(encoded)) + encoded)
+    elif isinstance(value, array):
+        raw = value.tobytes()
+        out.append(b'a' + value.typecode.encode('ascii') + _LENGTH.pack(len(raw)) + raw)
+    elif isinstance(value, dict):
+        out.append(b'm' + _LENGTH.pack(len(value)))
+        for key, item in value.items():
+            _pack(str(key), out)
+            _pack(item, out)
+    elif isinstance(value, (list, tuple)):
+        out.append(b'l' + _LENGTH.pack(len(value)))
+        for item in value:
+            _pack(item, out)
+    else:
+        raise TypeError(f"Cannot snapshot {type(value).__name__}")
+
+def pack(value):
+    """Encode None, bools, ints, floats, str, arrays, lists and str-keyed dicts
+
+    Values are tagged with one byte; numbers are little-endian, strings
+    UTF-8 with a uint32 length, arrays their raw machine bytes. Tuples
+    come back as lists.
+    """
+    out = []
+    _pack(value, out)
+    return b''.join(out)
+
+def _take(buf, pos, length):
+    """Bytes pos..pos+length of buf; raises ValueError if the buffer ends first"""
+    if pos + length > len(buf):
+        raise ValueError(f"Snapshot truncated at {pos}")
+    return buf[pos:pos + length]
+
+def _unpack(buf, pos):
+    tag = buf[pos:pos + 1]
+    pos += 1
+    if tag == b'N':
+        return None, pos
+    if tag == b'T':
+        return True, pos
+    if tag == b'F':
+        return False, pos
+    if tag == b'i':
+        return _INT.unpack_from(buf, pos)[0], pos + _INT.size
+    if tag == b'd':
+        return _FLOAT.unpack_from(buf, pos)[0], pos + _FLOAT.size
+    if tag == b's':
+        (length,), pos = _LENGTH.unpack_from(buf, pos), pos + _LENGTH.size
+        return str(_take(buf, pos, length), 'utf-8'), pos + length
+    if tag == b'a':
+        typecode = chr(buf[pos])
+        (length,), pos = _LENGTH.unpack_from(buf, pos + 1), pos + 1 + _LENGTH.size
+        values = array(typecode)
+        values.frombytes(_take(buf, pos, length))
+        return values, pos + length
+    if tag == b'l':
+        (count,), pos = _LENGTH.unpack_from(buf, pos), pos + _LENGTH.size
+        items = []
+        for _ in range(count):
+            item, pos = _unpack(buf, pos)
+            items.append(item)
+        return items, pos
+    if tag == b'm':
+        (count,), pos = _LENGTH.unpack_from(buf, pos), pos + _LENGTH.size
+        items = {}
+        for _ in range(count):
+            key, pos = _unpack(buf, pos)
+            if not isinstance(key, str):
+                raise ValueError(f"Snapshot map key is not a string at {pos}")
+            items[key], pos = _unpack(buf, pos)
+        return items, pos
+    raise ValueError(f"Unknown snapshot tag {tag!r} at {pos - 1}")
+
+def unpack(buf):
+    """Decode one value encoded by pack() from bytes or a memoryview"""
+    value, _ = _unpack(buf, 0)
+    return value
+
+class DashboardSnapshot:
+    """One snapshot file, replaced atomically on every write
+
+    The file is a fixed header (magic, format version, body length,
+    write time) followed by one packed dict. It holds machine-native
+    arrays, so it is only meant to be read back on the device that
+    wrote it. A missing, truncated or other-version file reads as None
+    and the caller falls back to the data cache.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.written_at = None
+
+    def write(self, state, now=None):
+        """Pack state and replace the file with it; returns bytes written or None"""
+        now = time.time() if now is None else now
+        try:
+            body = pack(state)
+        except (TypeError, ValueError) as e:
+            print(f"Snapshot pack error: {e}")
+            return None
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(body), now))
+                f.write(body)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Snapshot write error: {e}")
+            return None
+        self.written_at = now
+        return HEADER.size + len(body)
+
+    def read(self):
+        """The last written state, or None; one mmap of the whole file
+
+        Any undecodable body reads as None, like a missing file.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if len(mapped) < HEADER.size:
+                        return None
+                    magic, version, length, written_at = HEADER.unpack_from(mapped, 0)
+                    if (magic != MAGIC or version != FORMAT_VERSION
+                            or len(mapped) != HEADER.size + length):
+                        return None
+                    # A bytes copy: a memoryview still held by a decode
+                    # error's traceback would keep the mmap from closing
+                    state = unpack(mapped[HEADER.size:])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+            print(f"Snapshot read error: {e}")
+            return None
+        self.written_at = written_at
+        return state
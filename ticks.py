@@ -0,0 +1,110 @@
+"""
+Tick Service
+Callbacks fired on wall-clock second, minute, midnight and ISO week boundaries
+"""
+
+from datetime import datetime, timedelta
+
+def _period(boundary, now):
+    """Key that changes exactly when boundary is crossed"""
+    if boundary == 'second':
+        return now.replace(microsecond=0)
+    if boundary == 'minute':
+        return now.replace(second=0, microsecond=0)
+    if boundary == 'day':
+        return now.date()
+    return now.isocalendar()[:2]
+
+def _next_boundary(boundary, now):
+    """Local wall-clock time of the next boundary after now"""
+    if boundary == 'second':
+        return now.replace(microsecond=0) + timedelta(seconds=1)
+    if boundary == 'minute':
+        return now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    midnight = datetime.combine(now.date(), datetime.min.time(), now.tzinfo)
+    if boundary == 'day':
+        return midnight + timedelta(days=1)
+    return midnight + timedelta(days=7 - now.weekday())
+
+class TickService:
+    """Fires callback(now) once per crossed boundary, aligned to the wall clock
+
+    The next wake-up is recomputed from the current time after every tick,
+    so timer lateness never accumulates. A late or skipped tick still fires
+    each boundary it crossed, once. Only subscribed boundaries wake the
+    service: without 'second' subscribers it sleeps a full minute.
+    """
+
+    BOUNDARIES = ('second', 'minute', 'day', 'week')
+
+    def __init__(self, schedule_once, now=datetime.now, slack=0.005, max_sleep=60):
+        """schedule_once(callback, delay) is e.g. kivy.clock.Clock.schedule_once"""
+        self.schedule_once = schedule_once
+        self.now = now
+        self.slack = slack           # Wake this much after a boundary, never before it
+        self.max_sleep = max_sleep   # Re-check at least this often (clock or DST changes)
+        self.callbacks = {boundary: [] for boundary in self.BOUNDARIES}
+        self._periods = {}
+        self._event = None
+        self.running = False
+
+    def subscribe(self, boundary, callback):
+        """Call callback(now) whenever boundary is crossed"""
+        if boundary not in self.callbacks:
+            raise ValueError(f"Unknown tick boundary: {boundary}")
+        self.callbacks[boundary].append(callback)
+        self._periods.pop(boundary, None)
+        if self.running:
+            # A finer boundary may need an earlier wake-up
+            self._reschedule(self.now())
+
+    def unsubscribe(self, boundary, callback):
+        if callback in self.callbacks.get(boundary, []):
+            self.callbacks[boundary].remove(callback)
+
+    def start(self):
+        """Fire every subscriber once with the current time, then follow boundaries"""
+        self.running = True
+        self._periods = {}
+        self.tick()
+
+    def stop(self):
+        self.running = False
+        self._cancel()
+
+    def _cancel(self):
+        if self._event is not None and hasattr(self._event, 'cancel'):
+            self._event.cancel()
+        self._event = None
+
+    def tick(self, *args):
+        """Fire boundaries crossed since the last tick and schedule the next one"""
+        now = self.now()
+        for boundary in self.BOUNDARIES:
+            callbacks = self.callbacks[boundary]
+            if not callbacks:
+                continue
+            period = _period(boundary, now)
+            if self._periods.get(boundary) == period:
+                continue
+            self._periods[boundary] = period
+            for callback in list(callbacks):
+                try:
+                    callback(now)
+                except Exception as e:
+                    print(f"Tick callback error ({boundary}): {e}")
+
+        if self.running:
+            self._reschedule(self.now())
+
+    def next_wake(self, now):
+        """Seconds from now until the earliest subscribed boundary"""
+        delays = [(_next_boundary(b, now) - now).total_seconds()
+                  for b in self.BOUNDARIES if self.callbacks[b]]
+        if not delays:
+            return self.max_sleep
+        return min(min(delays) + self.slack, self.max_sleep)
+
+    def _reschedule(self, now):
+        self._cancel()
+        self._event = self.schedule_once(self.tick, self.next_wake(now))
@@ -0,0 +1,143 @@
+"""
+UI Update Queue
+Thread-safe queue of card updates applied in one batch per frame
+"""
+
+import threading
+import time
+from collections import deque
+
+def replace(old, new):
+    """Default merge: the latest update wins"""
+    return new
+
+def prepend(old, new):
+    """Merge for incremental lists such as new headlines: newer items first"""
+    return new + old
+
+def combine(old, new):
+    """Merge for per-key dicts such as revalidation times"""
+    merged = dict(old)
+    merged.update(new)
+    return merged
+
+def _percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+class UpdateQueue:
+    """Background threads post typed updates; one callback per frame applies them
+
+    Each kind of update (usually one per card) is registered with the
+    function that applies it on the UI thread and how two pending updates
+    of that kind merge. post() may be called from any thread; the first
+    post after a drain schedules a single drain on the next frame, so
+    sources finishing close together cost one layout pass instead of one
+    each. Latency samples are kept from the (earliest merged) post to the
+    batch being applied and, once frame_presented() is called from the
+    window's flip, to the frame that shows it. after_batch(), if given,
+    runs once after every applied batch.
+    """
+
+    SAMPLES = 256
+
+    def __init__(self, schedule_once, clock=time.perf_counter, after_batch=None):
+        """schedule_once(callback, delay) is e.g. kivy.clock.Clock.schedule_once"""
+        self.schedule_once = schedule_once
+        self.clock = clock
+        self.after_batch = after_batch
+        self.kinds = {}
+        self._pending = {}  # kind -> [value, posted_at]
+        self._scheduled = False
+        self._presenting = []  # posted_at of updates applied but not yet on screen
+        self._lock = threading.Lock()
+        self.posted = 0
+        self.merged = 0
+        self.batches = 0
+        self.max_batch = 0
+        self.failed = 0
+        self.applied_ms = deque(maxlen=self.SAMPLES)
+        self.presented_ms = deque(maxlen=self.SAMPLES)
+        self.batch_ms = deque(maxlen=self.SAMPLES)
+
+    def register(self, kind, apply, merge=replace):
+        """Apply updates of kind with apply(value); merge(old, new) combines pending ones"""
+        self.kinds[kind] = (apply, merge)
+
+    def post(self, kind, value):
+        """Queue an update from any thread"""
+        if kind not in self.kinds:
+            raise ValueError(f"Unknown update kind: {kind}")
+        now = self.clock()
+        with self._lock:
+            self.posted += 1
+            pending = self._pending.get(kind)
+            if pending is None:
+                self._pending[kind] = [value, now]
+            else:
+                self.merged += 1
+                pending[0] = self.kinds[kind][1](pending[0], value)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.schedule_once(self.drain, 0)
+
+    def drain(self, *args):
+        """Apply every pending update in one batch; runs on the UI thread"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+        if not pending:
+            return 0
+
+        start = self.clock()
+        for kind, (value, posted_at) in pending.items():
+            try:
+                self.kinds[kind][0](value)
+            except Exception as e:
+                self.failed += 1
+                print(f"UI update error ({kind}): {e}")
+        end = self.clock()
+
+        with self._lock:
+            self.batches += 1
+            self.max_batch = max(self.max_batch, len(pending))
+            self.batch_ms.append((end - start) * 1000)
+            for _, posted_at in pending.values():
+                self.applied_ms.append((end - posted_at) * 1000)
+                self._presenting.append(posted_at)
+        if self.after_batch is not None:
+            try:
+                self.after_batch()
+            except Exception as e:
+                print(f"UI batch hook error: {e}")
+        return len(pending)
+
+    def frame_presented(self, *args):
+        """Call after every frame flip; completes latency samples of applied updates"""
+        if not self._presenting:
+            return
+        now = self.clock()
+        with self._lock:
+            presenting, self._presenting = self._presenting, []
+            self.presented_ms.extend((now - posted_at) * 1000 for posted_at in presenting)
+
+    def stats(self):
+        """Counters and p50/p95 latencies in milliseconds as a plain dict"""
+        with self._lock:
+            stats = {
+                'posted': self.posted,
+                'merged': self.merged,
+                'batches': self.batches,
+                'max_batch': self.max_batch,
+                'failed': self.failed,
+                'pending': len(self._pending)
+            }
+            for name, samples in (('applied', self.applied_ms), ('presented', self.presented_ms),
+                                  ('batch', self.batch_ms)):
+                samples = list(samples)
+                stats[f'{name}_p50_ms'] = _percentile(samples, 50)
+                stats[f'{name}_p95_ms'] = _percentile(samples, 95)
+            return stats
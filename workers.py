@@ -0,0 +1,138 @@
+"""
+Worker Pool
+Bounded, named worker threads for network I/O with per-key job merging
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+class WorkerPool:
+    """At most max_workers named threads working through a FIFO queue
+
+    A job submitted with a key while another job of that key is still
+    queued is merged into it: the caller gets the queued job's future.
+    Once a job has started, the same key queues a new one. Threads are
+    started on demand and named '<name>-<n>'. stats() reports queue depth
+    and counters for diagnostics.
+    """
+
+    def __init__(self, name, max_workers=4):
+        self.name = name
+        self.max_workers = max_workers
+        self._queue = deque()  # (key, future, fn, args)
+        self._pending = {}     # key -> future of a queued job
+        self._threads = []
+        self._idle = 0
+        self._running = 0
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self.submitted = 0
+        self.merged = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.max_queued = 0
+
+    def submit(self, fn, *args, key=None):
+        """Queue fn(*args); returns a Future. Raises RuntimeError after shutdown"""
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError(f"worker pool {self.name} is shut down")
+            if key is not None and key in self._pending:
+                self.merged += 1
+                return self._pending[key]
+
+            future = Future()
+            self._queue.append((key, future, fn, args))
+            if key is not None:
+                self._pending[key] = future
+            self.submitted += 1
+            self.max_queued = max(self.max_queued, len(self._queue))
+
+            if self._idle < len(self._queue) and len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._work, daemon=True,
+                                          name=f"{self.name}-{len(self._threads) + 1}")
+                self._threads.append(thread)
+                thread.start()
+            self._wake.notify()
+            return future
+
+    def map(self, fn, items, key=None):
+        """fn(item) for every item on the pool; results in order, exceptions re-raised"""
+        futures = [self.submit(fn, item, key=key(item) if key else None) for item in items]
+        return [future.result() for future in futures]
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+                while not self._queue and not self._stopped:
+                    self._wake.wait()
+                self._idle -= 1
+                if not self._queue:
+                    return
+                key, future, fn, args = self._queue.popleft()
+                if key is not None and self._pending.get(key) is future:
+                    del self._pending[key]
+                if not future.set_running_or_notify_cancel():
+                    self.cancelled += 1
+                    continue
+                self._running += 1
+
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+                ok = False
+            else:
+                future.set_result(result)
+                ok = True
+
+            with self._lock:
+                self._running -= 1
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def stats(self):
+        """Queue depth, busy workers and job counters as a plain dict"""
+        with self._lock:
+            return {
+                'workers': len(self._threads),
+                'max_workers': self.max_workers,
+                'queued': len(self._queue),
+                'running': self._running,
+                'max_queued': self.max_queued,
+                'submitted': self.submitted,
+                'merged': self.merged,
+                'completed': self.completed,
+                'failed': self.failed,
+                'cancelled': self.cancelled
+            }
+
+    def shutdown(self, timeout=None):
+        """Cancel queued jobs and stop the workers; returns False if some are still busy
+
+        Jobs already running cannot be interrupted. Waits up to timeout
+        seconds (forever with None, not at all with 0) for them to end.
+        """
+        with self._lock:
+            self._stopped = True
+            while self._queue:
+                _, future, _, _ = self._queue.popleft()
+                if future.cancel():
+                    self.cancelled += 1
+            self._pending.clear()
+            self._wake.notify_all()
+            threads = list(self._threads)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in threads:
+            if thread is threading.current_thread():
+                continue
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in threads)
@@ -0,0 +1,129 @@
+"""
+World Clock
+City times from one UTC instant, with UTC offsets cached between DST transitions
+"""
+
+import bisect
+import time
+import zoneinfo
+from datetime import datetime
+from functools import lru_cache
+
+DEFAULT_WORLD_CLOCKS = "UTC, Tokyo=Asia/Tokyo, London=Europe/London, New York=America/New_York"
+
+# Transitions are searched this far ahead, then again once the table runs out
+TABLE_DAYS = 400
+DAY = 86400
+
+@lru_cache(maxsize=None)
+def get_zone(key):
+    """ZoneInfo for an IANA key, resolved once per process"""
+    return zoneinfo.ZoneInfo(key)
+
+def parse_cities(text):
+    """Parse 'Name=Area/City, Area/City' into [(name, zone key)]
+
+    Without a name the city part of the key is shown, e.g. 'Asia/Tokyo'
+    becomes 'Tokyo'.
+    """
+    cities = []
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, key = item.rpartition('=')
+        key = key.strip()
+        name = name.strip() or key.rsplit('/', 1)[-1].replace('_', ' ')
+        cities.append((name, key))
+    return cities
+
+def _offset(zone, ts):
+    """UTC offset of zone at Unix time ts, in seconds"""
+    return int(datetime.fromtimestamp(ts, zone).utcoffset().total_seconds())
+
+def transition_table(zone, start, days=TABLE_DAYS):
+    """Offset changes of zone in [start, start + days): ([utc ts], [offset after])
+
+    The first entry is start itself with the offset then in effect. Days
+    are scanned for a change and each change is narrowed to the second.
+    """
+    times = [start]
+    offsets = [_offset(zone, start)]
+    end = start + days * DAY
+    ts = start
+    while ts < end:
+        step_end = min(ts + DAY, end)
+        if _offset(zone, step_end) != offsets[-1]:
+            low, high = ts, step_end
+            while high - low > 1:
+                mid = (low + high) // 2
+                if _offset(zone, mid) == offsets[-1]:
+                    low = mid
+                else:
+                    high = mid
+            times.append(high)
+            offsets.append(_offset(zone, high))
+        ts = step_end
+    return times, offsets
+
+class ZoneOffsets:
+    """UTC offset lookups for one zone from its transition table"""
+
+    def __init__(self, zone):
+        self.zone = zone
+        self.times = []
+        self.offsets = []
+        self.valid_until = 0
+
+    def offset(self, ts):
+        if not self.times or not self.times[0] <= ts < self.valid_until:
+            start = int(ts)
+            self.times, self.offsets = transition_table(self.zone, start)
+            self.valid_until = start + TABLE_DAYS * DAY
+        return self.offsets[bisect.bisect_right(self.times, ts) - 1]
+
+    def next_transition(self, ts):
+        """Unix time of the next offset change after ts within the table, or None"""
+        self.offset(ts)
+        i = bisect.bisect_right(self.times, ts)
+        return self.times[i] if i < len(self.times) else None
+
+class WorldClock:
+    """Local times of many cities from a single UTC instant
+
+    Zones are resolved once. Between DST transitions each city's time is
+    plain integer arithmetic on the shared instant; offsets are only
+    looked up again when some zone passes its next transition.
+    """
+
+    def __init__(self, cities):
+        self.cities = []
+        self._zones = []
+        for name, key in cities:
+            try:
+                self._zones.append(ZoneOffsets(get_zone(key)))
+                self.cities.append(name)
+            except (zoneinfo.ZoneInfoNotFoundError, ValueError) as e:
+                print(f"Clock error for {name}: {e}")
+        self._offsets = []
+        self._start = 0
+        self._valid_until = 0
+
+    def offsets(self, ts):
+        """Current UTC offsets of every city, in seconds"""
+        if not self._offsets or not self._start <= ts < self._valid_until:
+            self._start = ts
+            self._offsets = [zone.offset(ts) for zone in self._zones]
+            upcoming = [t for t in (zone.next_transition(ts) for zone in self._zones)
+                        if t is not None]
+            self._valid_until = min(upcoming, default=ts + DAY)
+        return self._offsets
+
+    def times(self, ts=None):
+        """[(city, 'HH:MM')] at Unix time ts (default now)"""
+        ts = int(time.time() if ts is None else ts)
+        values = []
+        for name, offset in zip(self.cities, self.offsets(ts)):
+            minutes = (ts + offset) // 60 % (24 * 60)
+            values.append((name, f"{minutes // 60:02d}:{minutes % 60:02d}"))
+        return values